@@ -1,72 +1,60 @@
-import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-import os
+import tariff_cache
+import tariff_engine
 
-def simulate_tariff_impact(tariff_rate, sector_percentages, elasticities, inflation_rate=0.02, retaliation_factor=0.05, years=4, quarters_per_year=4):
-    gdp = {"USA": 27.0, "China": 17.7, "EU": 18.8, "Mexico": 1.7, "Canada": 2.2}
-    exports = {"USA": 2.1, "China": 3.6, "EU": 2.7, "Mexico": 0.5, "Canada": 0.6}
-    imports = {"USA": 3.3, "China": 2.7, "EU": 2.6, "Mexico": 0.6, "Canada": 0.5}
-    
+def simulate_tariff_impact(tariff_rate, sector_percentages, elasticities, inflation_rate=0.02, retaliation_factor=0.05, years=4, quarters_per_year=4, as_array=False, cache=True):
     total_quarters = years * quarters_per_year
-    gdp_impact_quarters = {country: [] for country in gdp.keys()}
-    
-    for quarter in range(total_quarters):
-        gdp_impact = {}
-        year_fraction = quarter / quarters_per_year
-        for country in gdp.keys():
-            impact = 0
-            for sector, percent in sector_percentages.items():
-                export_loss = exports[country] * percent * (1 - tariff_rate * elasticities[sector])
-                import_cost = imports[country] * percent * (1 + tariff_rate * elasticities[sector])
-                sector_impact = export_loss - import_cost
-                impact += sector_impact
-            impact *= (1 - inflation_rate) ** year_fraction
-            impact *= (1 - retaliation_factor * year_fraction)
-            gdp_impact[country] = max(-20, (impact / gdp[country]) * 100)  # Ensure Y values stay within 0 to -20
-            gdp_impact_quarters[country].append(gdp_impact[country])
-    
-    return gdp_impact_quarters
+    simulate = tariff_cache.simulate if cache else tariff_engine.simulate
+    countries, grid = simulate(tariff_rate, sector_percentages, elasticities,
+                               inflation_rate, retaliation_factor, steps=total_quarters,
+                               steps_per_year=quarters_per_year,
+                               floor=-20)  # Ensure Y values stay within 0 to -20
+    if as_array:
+        return grid  # shape (countries, quarters)
+    return tariff_engine.grid_to_dict(countries, grid)
 
-def create_animation(gdp_impact_quarters, filename="tariff_impact.mp4", frame_width=640, frame_height=480, fps=2, loops=4):
-    temp_dir = "temp_frames"
-    os.makedirs(temp_dir, exist_ok=True)
-    frame_files = []
+def _frame_renderer(gdp_impact_quarters, frame_width, frame_height):
+    # Plotting libraries are imported here so the numeric path stays light
+    import matplotlib.pyplot as plt
+    import frame_pipeline
     
-    for _ in range(loops):
-        for frame, _ in enumerate(next(iter(gdp_impact_quarters.values()))):
-            fig, ax = plt.subplots(figsize=(10, 5))
-            for country, impact in gdp_impact_quarters.items():
-                ax.plot(range(frame + 1), impact[:frame + 1], label=country, marker='o')
-            ax.set_xlim(0, len(next(iter(gdp_impact_quarters.values()))))
-            ax.set_ylim(-20, 0)  # Keep Y values between 0 and -20
-            ax.set_xlabel("Quarters")
-            ax.set_ylabel("GDP Impact (% Change)")
-            ax.set_title("GDP Impact of Tariffs Over Time (With Inflation & Retaliation)")
-            ax.legend()
-            ax.grid()
-            frame_path = os.path.join(temp_dir, f"frame_{len(frame_files):04d}.png")
-            plt.savefig(frame_path)
-            plt.close(fig)
-            frame_files.append(frame_path)
+    # Build the chart once; each frame only moves the line data
+    fig, ax = plt.subplots(figsize=(10, 5))
+    lines = {country: ax.plot([], [], label=country, marker='o')[0] for country in gdp_impact_quarters}
+    ax.set_xlim(0, len(next(iter(gdp_impact_quarters.values()))))
+    ax.set_ylim(-20, 0)  # Keep Y values between 0 and -20
+    ax.set_xlabel("Quarters")
+    ax.set_ylabel("GDP Impact (% Change)")
+    ax.set_title("GDP Impact of Tariffs Over Time (With Inflation & Retaliation)")
+    ax.legend()
+    ax.grid()
+    renderer = frame_pipeline.IncrementalRenderer(fig, list(lines.values()))
     
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    video = cv2.VideoWriter(filename, fourcc, fps, (frame_width, frame_height))
+    def draw(frame):
+        for country, impact in gdp_impact_quarters.items():
+            lines[country].set_data(range(frame + 1), impact[:frame + 1])
+        return renderer.render((frame_width, frame_height))
+    
+    draw.close = lambda: plt.close(fig)
+    return draw
+
+def create_animation(gdp_impact_quarters, filename="tariff_impact.mp4", frame_width=640, frame_height=480, fps=2, loops=4, cache_bytes=256 * 1024 * 1024, workers=1, frames=None):
+    import parallel_render
+    import stream_encoder
     
-    for frame_file in frame_files:
-        frame_img = cv2.imread(frame_file)
-        frame_img = cv2.resize(frame_img, (frame_width, frame_height))
-        video.write(frame_img)
+    video = stream_encoder.Mp4Encoder(filename, fps, (frame_width, frame_height))
+    quarters = len(next(iter(gdp_impact_quarters.values())))
+    frames = frames if frames is not None else quarters * loops
     
+    # Each quarter is rendered once, later loops replay it from the frame cache
+    parallel_render.render(_frame_renderer, [frame % quarters for frame in range(frames)], video, workers=workers,
+                           args=(gdp_impact_quarters, frame_width, frame_height), cache_bytes=cache_bytes)
     video.release()
-    for frame_file in frame_files:
-        os.remove(frame_file)
-    os.rmdir(temp_dir)
 
 def main():
     tariff_rate = 0.20
-    sector_percentages = {"Technology": 0.30, "Automotive": 0.20, "Agriculture": 0.15, "Energy": 0.20, "Manufacturing": 0.15}
-    elasticities = {"Technology": 1.2, "Automotive": 0.8, "Agriculture": 0.9, "Energy": 0.6, "Manufacturing": 1.0}
+    sector_percentages = tariff_engine.SECTOR_PERCENTAGES
+    elasticities = tariff_engine.ELASTICITIES
     
     results = simulate_tariff_impact(tariff_rate, sector_percentages, elasticities, inflation_rate=0.02, retaliation_factor=0.05)
     
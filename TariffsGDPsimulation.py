@@ -1,9 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import cv2
+import frame_pipeline
+import parallel_render
+import stream_encoder
 
 # Parameters for years 2025 to 2028
-years = np.arange(2025, 2029, 1/12)  
+years = np.arange(2025, 2029, 1/12)
 total_months = len(years)
 
 # GDP
@@ -13,35 +15,42 @@ us_gdp_change = np.linspace(0, -0.8, total_months)
 # IPL
 frame_width = 800
 frame_height = 600
-fps = 30  
-loop_duration = 5  
+fps = 30
+loop_duration = 5
 frames_per_loop = fps * loop_duration
-num_loops = 4  
+num_loops = 4
 total_frames = frames_per_loop * num_loops
-fourcc = cv2.VideoWriter_fourcc(*"mp4v")  
-out = cv2.VideoWriter("gdp_projection.mp4", fourcc, fps, (frame_width, frame_height))
-for frame in range(total_frames):
-    month_idx = frame % total_months  
-   
+workers = 1  # Render processes
+
+def month_renderer():
+    # Build the chart once; each frame only moves the line data
     fig, ax = plt.subplots(figsize=(8, 6))
     ax.set_xlim(2025, 2028)
     ax.set_ylim(-6, 1)
     ax.set_xlabel("Year")
     ax.set_ylabel("GDP Change (%)")
     ax.set_title("Projected GDP Change Due to US-Canada Tariffs")
-   
-    ax.plot(years[:month_idx+1], canada_gdp_change[:month_idx+1], marker="o", label="Canada GDP Change", color="red")
-    ax.plot(years[:month_idx+1], us_gdp_change[:month_idx+1], marker="o", label="US GDP Change", color="blue")
+
+    canada_line, = ax.plot([], [], marker="o", label="Canada GDP Change", color="red")
+    us_line, = ax.plot([], [], marker="o", label="US GDP Change", color="blue")
     ax.legend()
-   
-    plt.savefig("temp_frame.png")
-    plt.close(fig)
-   
-    frame_img = cv2.imread("temp_frame.png")
-    frame_img = cv2.resize(frame_img, (frame_width, frame_height))
-   
-    out.write(frame_img)
-
-# Pump out the video
-out.release()
-print("Video saved as gdp_projection.mp4")
+    renderer = frame_pipeline.IncrementalRenderer(fig, [canada_line, us_line])
+
+    def draw(month_idx):
+        canada_line.set_data(years[:month_idx+1], canada_gdp_change[:month_idx+1])
+        us_line.set_data(years[:month_idx+1], us_gdp_change[:month_idx+1])
+        return renderer.render((frame_width, frame_height))
+
+    draw.close = lambda: plt.close(fig)
+    return draw
+
+if __name__ == "__main__":
+    out = stream_encoder.Mp4Encoder("gdp_projection.mp4", fps, (frame_width, frame_height))
+
+    # Only total_months distinct states exist, the rest of the frames are replays
+    month_states = [frame % total_months for frame in range(total_frames)]
+    parallel_render.render(month_renderer, month_states, out, workers=workers)
+
+    # Pump out the video
+    out.release()
+    print("Video saved as gdp_projection.mp4")
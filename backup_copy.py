@@ -0,0 +1,258 @@
+import os
+import sys
+import mmap
+import time
+import errno
+import shutil
+import hashlib
+import argparse
+from contextlib import contextmanager
+
+"""
+# Compare the copy engines on tmpfs and on an ext4 directory (256 MB test file each)
+python3 backup_copy.py /dev/shm /var/tmp --size-mb 256
+"""
+
+BUFFER_SIZE = 8 * 1024 * 1024  # 8 MiB reads keep USB drives streaming
+KERNEL_CHUNK = 1024 * 1024 * 1024  # Bytes per copy_file_range/sendfile call
+ZEROCOPY_MAX = 256 * 1024 * 1024  # Larger files (or ones over half of free memory) take the fused path in zerocopy
+
+# Errors meaning "this syscall can't copy between these two files", not a failed copy
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+# Set to a dict to accumulate seconds spent per stage ("copy", "hash"); backup_script does this per file
+stage_times = None
+
+
+@contextmanager
+def timed(stage):
+    if stage_times is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_times[stage] = stage_times.get(stage, 0.0) + time.perf_counter() - start
+
+
+def hash_file(path, buffer_size=BUFFER_SIZE, drop_cache=False):
+    """
+    SHA-256 of a file using one reusable buffer. With drop_cache=True the file's
+    clean pages are evicted first, so the hash reflects what is on the device.
+    """
+    hasher = hashlib.sha256()
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    with open(path, 'rb') as f:
+        if drop_cache and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def mmap_hash(path, drop_cache=False):
+    """SHA-256 of a file hashed straight out of a read-only mapping, without copying into Python buffers."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if drop_cache and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hasher.hexdigest()  # Empty files can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if hasattr(m, "madvise"):
+                m.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(m) as view:
+                for offset in range(0, size, BUFFER_SIZE):
+                    hasher.update(view[offset:offset + BUFFER_SIZE])
+    return hasher.hexdigest()
+
+
+def fused_copy(src, dst, buffer_size=BUFFER_SIZE, fsync=False):
+    """
+    Streams src into dst once, hashing each block as it is written.
+    Returns the source SHA-256. Metadata is copied like shutil.copy2.
+    """
+    hasher = hashlib.sha256()
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+            fdst.write(view[:n])
+        if fsync:
+            fdst.flush()
+            os.fsync(fdst.fileno())
+    shutil.copystat(src, dst)
+    return hasher.hexdigest()
+
+
+def kernel_copy(src, dst, fsync=False):
+    """
+    Copies without moving data through user space: os.copy_file_range first, then
+    os.sendfile, then a buffered loop for whatever they could not handle (other
+    platforms, filesystems or kernels that refuse the syscall). Metadata is copied
+    like shutil.copy2.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(infd).st_size
+        copied = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while copied < size:
+                    n = os.copy_file_range(infd, outfd, min(KERNEL_CHUNK, size - copied), copied, copied)
+                    if not n:
+                        break
+                    copied += n
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+        if copied < size and hasattr(os, "sendfile"):
+            os.lseek(outfd, copied, os.SEEK_SET)
+            try:
+                while copied < size:
+                    n = os.sendfile(outfd, infd, copied, min(KERNEL_CHUNK, size - copied))
+                    if not n:
+                        break
+                    copied += n
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+        # Buffered tail: runs to EOF so a file that grew is still copied whole
+        fsrc.seek(copied)
+        fdst.seek(copied)
+        shutil.copyfileobj(fsrc, fdst, BUFFER_SIZE)
+        if fsync:
+            fdst.flush()
+            os.fsync(outfd)
+    shutil.copystat(src, dst)
+
+
+def legacy_copy_and_hash(src, dst, fsync=False):
+    """Original engine: shutil.copy2, then hash source and destination in 4 KiB reads."""
+    with timed("copy"):
+        shutil.copy2(src, dst)
+    with timed("hash"):
+        return hash_file(src, buffer_size=4096), hash_file(dst, buffer_size=4096)
+
+
+def _fits_page_cache(size):
+    try:
+        free = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError):
+        free = ZEROCOPY_MAX
+    return size <= min(ZEROCOPY_MAX, free // 2)
+
+
+def zerocopy_and_hash(src, dst, fsync=False):
+    """
+    Zero-copy engine. The source is hashed through mmap first, which also pulls it
+    into the page cache, so the kernel copy that follows is served from memory and
+    the device is read once. The destination is then hashed through mmap as well.
+
+    That only holds while the file stays cached between the hash and the copy. A
+    file over ZEROCOPY_MAX or half of free memory would be read from the device
+    twice, so those are copied and hashed in one pass by fused_copy instead.
+    """
+    if not _fits_page_cache(os.path.getsize(src)):
+        with timed("copy"):
+            src_hash = fused_copy(src, dst, fsync=fsync)
+        with timed("hash"):
+            return src_hash, mmap_hash(dst, drop_cache=fsync)
+    with timed("hash"):
+        src_hash = mmap_hash(src)
+    with timed("copy"):
+        kernel_copy(src, dst, fsync=fsync)
+    with timed("hash"):
+        return src_hash, mmap_hash(dst, drop_cache=fsync)
+
+
+def copy_and_hash(src, dst, fsync=False):
+    """
+    Fused copy engine: one read of the source, one read-back of the destination.
+    With fsync=True the destination is flushed to the device and its page cache
+    dropped before the read-back, so the comparison checks the media itself.
+    Returns (source hash, destination hash).
+    """
+    with timed("copy"):
+        src_hash = fused_copy(src, dst, fsync=fsync)
+    with timed("hash"):
+        return src_hash, hash_file(dst, drop_cache=fsync)
+
+
+# Name -> copy_and_hash(src, dst, fsync) returning (source hash, destination hash)
+ENGINES = {
+    "fused": copy_and_hash,
+    "zerocopy": zerocopy_and_hash,
+    "legacy": legacy_copy_and_hash,
+}
+
+
+# ===== BENCHMARK =====
+
+def benchmark(dirs, size_mb=256, repeat=3):
+    """
+    Times each engine copying a random file within each directory (e.g. tmpfs and
+    ext4). The source's cached pages are dropped before every run so disk-backed
+    directories are read from the device. Returns {dir: {engine: stats}}.
+    """
+    results = {}
+    for directory in dirs:
+        src = os.path.join(directory, "backup_copy_bench.src")
+        dst = os.path.join(directory, "backup_copy_bench.dst")
+        with open(src, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+        results[directory] = {}
+        try:
+            for name, engine in ENGINES.items():
+                best = None
+                for _ in range(repeat):
+                    with open(src, 'rb') as f:
+                        if hasattr(os, "posix_fadvise"):
+                            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                    if os.path.exists(dst):
+                        os.remove(dst)
+                    wall, cpu = time.perf_counter(), time.process_time()
+                    src_hash, dst_hash = engine(src, dst)
+                    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                    if src_hash != dst_hash:
+                        raise RuntimeError(f"{name} produced a mismatching copy in {directory}")
+                    if best is None or wall < best["seconds"]:
+                        best = {"seconds": round(wall, 4), "cpu_seconds": round(cpu, 4),
+                                "mb_per_s": round(size_mb / wall, 1)}
+                results[directory][name] = best
+        finally:
+            for path in (src, dst):
+                if os.path.exists(path):
+                    os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backup copy engines")
+    parser.add_argument("dirs", nargs="+", help="Directories to test in, e.g. a tmpfs and an ext4 path")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the test file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine; the fastest is reported")
+    args = parser.parse_args()
+    for directory in args.dirs:
+        if not os.path.isdir(directory):
+            sys.exit(f"Not a directory: {directory}")
+
+    for directory, engines in benchmark(args.dirs, args.size_mb, args.repeat).items():
+        print(directory)
+        for name, stats in engines.items():
+            print(f"  {name:<9} {stats['seconds']:8.3f}s {stats['mb_per_s']:9.1f} MB/s  cpu={stats['cpu_seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
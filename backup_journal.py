@@ -0,0 +1,72 @@
+import os
+import json
+import time
+from backup_manifest import DONE
+
+
+class Journal:
+    """
+    Append-only JSON-lines record of every finished file in one directory backup,
+    so a killed or paused run can resume where it stopped. The first line holds the
+    snapshot date, which a resumed run reuses so it keeps filling the same snapshot.
+
+    Lines are flushed as they are written and fsynced every sync_every entries or
+    sync_seconds. A crash can only lose the unsynced tail, and those files are then
+    simply copied again. Copied data is only guaranteed on disk with --fsync-verify.
+    """
+
+    def __init__(self, path, date_str, sync_every=256, sync_seconds=5.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+        self.date_str = date_str
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        if os.path.exists(path):
+            self._truncate_torn_tail()
+            with open(path) as f:
+                header = f.readline()
+            if header:
+                self.date_str = json.loads(header)["date"]
+        self.file = open(path, 'a')
+        if self.file.tell() == 0:
+            self.file.write(json.dumps({"date": self.date_str}) + "\n")
+            self.sync()
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def _truncate_torn_tail(self):
+        # A crash mid-write leaves a partial last line; drop it before appending
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def entries(self):
+        with open(self.path) as f:
+            f.readline()
+            for line in f:
+                yield json.loads(line)
+
+    def completed(self):
+        """Source paths already copied and verified by an earlier run."""
+        return {entry["source"] for entry in self.entries() if entry["status"] in DONE}
+
+    def append(self, result):
+        self.file.write(json.dumps(result) + "\n")
+        self.unsynced += 1
+        if self.unsynced >= self.sync_every or time.monotonic() - self.synced_at >= self.sync_seconds:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    def remove(self):
+        os.remove(self.path)
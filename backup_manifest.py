@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import threading
+
+# Result statuses meaning the file's content is safely in the snapshot
+DONE = ("verified", "linked", "stored", "deduplicated", "packed")
+
+
+class Manifest:
+    """
+    SQLite index of backed-up files: source path -> size, mtime, inode, SHA-256 and
+    the snapshot file currently holding that content. Only the main process touches
+    it; workers report what they did and the results are recorded in one transaction.
+    Drive threads share one connection, serialized by a lock.
+    """
+
+    def __init__(self, path, match_inode=True):
+        self.match_inode = match_inode
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS files (
+                               path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,
+                               inode INTEGER, sha256 TEXT, copy TEXT)""")
+
+    def lookup(self, path, size, mtime_ns, inode):
+        """Returns (copy, sha256) when path is unchanged since its last backup and the copy still exists, else None."""
+        with self.lock:
+            row = self.db.execute("SELECT size, mtime_ns, inode, sha256, copy FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        if row[0] != size or row[1] != mtime_ns or (self.match_inode and row[2] != inode):
+            return None
+        sha256, copy = row[3], row[4]
+        if not os.path.exists(copy):
+            return None
+        return copy, sha256
+
+    def record(self, results):
+        rows = [(r["source"], r["size"], r["mtime_ns"], r["inode"], r["sha256"], r["file"])
+                for r in results if r["status"] in DONE]
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import threading
+from collections import Counter
+
+# Upper bounds (seconds) of the per-file latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        total, out = 0, []
+        for n in self.counts:
+            total += n
+            out.append(total)
+        return out
+
+    def to_dict(self):
+        labels = [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+        return {"buckets": dict(zip(labels, self.cumulative())), "sum": round(self.sum, 6), "count": self.count}
+
+
+class _DeviceStats:
+    def __init__(self):
+        self.bytes = 0
+        self.files = 0
+        self.retries = 0
+        self.statuses = Counter()
+        self.copy = Histogram()
+        self.hash = Histogram()
+        self.last_bytes = 0
+        self.last_files = 0
+
+
+class Metrics:
+    """
+    Live backup metrics per source device: bytes and files per second, copy and hash
+    latency histograms, retries, statuses and the scheduler's queue depth.
+
+    observe() is called with every file result. A background thread rewrites a JSON
+    snapshot and a Prometheus textfile-collector file every interval seconds, both
+    replaced atomically so readers never see a partial file; stop() writes the final
+    version and returns it as the run summary.
+    """
+
+    def __init__(self, json_path, prom_path, scheduler=None, interval=10.0):
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.scheduler = scheduler
+        self.interval = interval
+        self.devices = {}
+        self.lock = threading.Lock()
+        self.started = self.last_write = time.time()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def observe(self, device, result, nbytes):
+        with self.lock:
+            d = self.devices.setdefault(device, _DeviceStats())
+            d.files += 1
+            d.bytes += nbytes
+            d.retries += result.get("retries", 0)
+            d.statuses[result["status"]] += 1
+            if "copy_seconds" in result:
+                d.copy.observe(result["copy_seconds"])
+            if "hash_seconds" in result:
+                d.hash.observe(result["hash_seconds"])
+
+    def snapshot(self, final=False):
+        now = time.time()
+        with self.lock:
+            elapsed = max(now - self.started, 1e-9)
+            window = max(now - self.last_write, 1e-9)
+            depths = self.scheduler.depths() if self.scheduler else {}
+            devices = {}
+            for name, d in self.devices.items():
+                devices[name] = {
+                    "bytes": d.bytes,
+                    "files": d.files,
+                    "bytes_per_s": round(d.bytes / elapsed, 1),
+                    "files_per_s": round(d.files / elapsed, 2),
+                    "current_bytes_per_s": round((d.bytes - d.last_bytes) / window, 1),
+                    "current_files_per_s": round((d.files - d.last_files) / window, 2),
+                    "retries": d.retries,
+                    "statuses": dict(d.statuses),
+                    "copy_seconds": d.copy.to_dict(),
+                    "hash_seconds": d.hash.to_dict(),
+                    "in_flight": depths.get(name, (0, 0))[0],
+                    "limit": depths.get(name, (0, 0))[1],
+                }
+                d.last_bytes, d.last_files = d.bytes, d.files
+            self.last_write = now
+            total_bytes = sum(d["bytes"] for d in devices.values())
+            total_files = sum(d["files"] for d in devices.values())
+            return {
+                "timestamp": now,
+                "elapsed_s": round(elapsed, 1),
+                "final": final,
+                "bytes": total_bytes,
+                "files": total_files,
+                "bytes_per_s": round(total_bytes / elapsed, 1),
+                "files_per_s": round(total_files / elapsed, 2),
+                "dest_in_flight": self.scheduler.dest_in_flight if self.scheduler else 0,
+                "devices": devices,
+            }
+
+    def write(self, final=False):
+        snap = self.snapshot(final)
+        _replace(self.json_path, json.dumps(snap, indent=2))
+        _replace(self.prom_path, prometheus(snap))
+        return snap
+
+    def _run(self):
+        while not self.stopping.wait(self.interval):
+            self.write()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+        return self.write(final=True)
+
+
+def _replace(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def prometheus(snap):
+    """Renders a snapshot in the Prometheus text exposition format."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        # samples: (name suffix, labels, value)
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{name}{suffix}{{{label_str}}} {value}" if label_str else f"{name}{suffix} {value}")
+
+    devices = snap["devices"]
+    metric("backup_bytes_total", "counter", "Bytes read from the source device this run",
+           [("", {"device": n}, d["bytes"]) for n, d in devices.items()])
+    metric("backup_files_total", "counter", "Files processed this run by result status",
+           [("", {"device": n, "status": s}, c) for n, d in devices.items() for s, c in d["statuses"].items()])
+    metric("backup_retries_total", "counter", "Copy attempts that had to be retried",
+           [("", {"device": n}, d["retries"]) for n, d in devices.items()])
+    metric("backup_bytes_per_second", "gauge", "Read throughput since the previous refresh",
+           [("", {"device": n}, d["current_bytes_per_s"]) for n, d in devices.items()])
+    metric("backup_files_per_second", "gauge", "Files finished per second since the previous refresh",
+           [("", {"device": n}, d["current_files_per_s"]) for n, d in devices.items()])
+    metric("backup_queue_depth", "gauge", "Batches in flight on the device",
+           [("", {"device": n}, d["in_flight"]) for n, d in devices.items()])
+    metric("backup_device_limit", "gauge", "Current adaptive limit on batches in flight",
+           [("", {"device": n}, d["limit"]) for n, d in devices.items()])
+    metric("backup_dest_queue_depth", "gauge", "Batches in flight to the destination",
+           [("", {}, snap["dest_in_flight"])])
+    for stage in ("copy", "hash"):
+        samples = []
+        for n, d in devices.items():
+            hist = d[f"{stage}_seconds"]
+            samples += [("_bucket", {"device": n, "le": le}, count) for le, count in hist["buckets"].items()]
+            samples += [("_sum", {"device": n}, hist["sum"]), ("_count", {"device": n}, hist["count"])]
+        metric(f"backup_{stage}_seconds", "histogram", f"Per-file {stage} latency", samples)
+    metric("backup_last_update_timestamp_seconds", "gauge", "When this file was written",
+           [("", {}, round(snap["timestamp"], 3))])
+    return "\n".join(lines) + "\n"
+
+
+def summary(snap):
+    """Human-readable end-of-run lines for the console and the log."""
+    lines = [f"{snap['files']} files, {snap['bytes'] / 1e6:.1f} MB in {snap['elapsed_s']:.0f}s "
+             f"({snap['bytes_per_s'] / 1e6:.1f} MB/s, {snap['files_per_s']:.1f} files/s)"]
+    for name, d in snap["devices"].items():
+        copy, hashed = d["copy_seconds"], d["hash_seconds"]
+        mean_copy = copy["sum"] / copy["count"] if copy["count"] else 0.0
+        mean_hash = hashed["sum"] / hashed["count"] if hashed["count"] else 0.0
+        statuses = ", ".join(f"{n} {s}" for s, n in d["statuses"].items())
+        lines.append(f"  {name}: {d['bytes_per_s'] / 1e6:.1f} MB/s, {d['files_per_s']:.1f} files/s, "
+                     f"copy {mean_copy * 1000:.1f} ms/file, hash {mean_hash * 1000:.1f} ms/file, "
+                     f"{d['retries']} retries ({statuses})")
+    return "\n".join(lines)
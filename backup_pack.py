@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import zlib
+import time
+import hashlib
+import argparse
+
+"""
+# List what a snapshot's packs hold
+python3 backup_pack.py list /mnt/backup_drive/blink/DCIM_2026-10-18
+
+# Print one packed file
+python3 backup_pack.py cat /mnt/backup_drive/blink/DCIM_2026-10-18 100MEDIA/IMG_0001.JPG > IMG_0001.JPG
+
+# Restore every packed file into a directory, checking each SHA-256
+python3 backup_pack.py extract /mnt/backup_drive/blink/DCIM_2026-10-18 /tmp/restore --verify
+"""
+
+PACK_DIR = ".packs"  # Inside each snapshot directory
+MAX_PACK_BYTES = 1024 * 1024 * 1024
+COMPRESS_LEVEL = 6
+MIN_SAVING = 0.9  # Keep the zlib version only if it is at most 90% of the original
+
+
+class PackWriter:
+    """
+    Appends small files to <snapshot>/.packs/pack-<tag>-<n>.pack, rolling over to a
+    new pack past max_bytes. Every pack has a JSON-lines .idx next to it with one
+    entry per file: path (relative to the snapshot), offset, length, size, sha256,
+    compression, mode, mtime_ns and written_ns, the time the record was added.
+
+    Records go to the data file first and their index lines only on flush(), after
+    the data, so a crash can leave unindexed bytes at the end of a pack but never an
+    index entry pointing at missing data. A pack has exactly one writer: backup
+    workers tag theirs with their pid.
+    """
+
+    def __init__(self, snapshot_dir, tag=None, max_bytes=MAX_PACK_BYTES):
+        self.dir = os.path.join(snapshot_dir, PACK_DIR)
+        os.makedirs(self.dir, exist_ok=True)
+        self.tag = tag or str(os.getpid())
+        self.max_bytes = max_bytes
+        self.pending = []
+        prefix = f"pack-{self.tag}-"
+        seqs = [int(name[len(prefix):-5]) for name in os.listdir(self.dir)
+                if name.startswith(prefix) and name.endswith(".pack")]
+        self._open(max(seqs, default=0))
+
+    def _open(self, seq):
+        self.seq = seq
+        base = os.path.join(self.dir, f"pack-{self.tag}-{seq:04d}")
+        self.pack_path = base + ".pack"
+        self.data = open(base + ".pack", 'ab')
+        if os.path.exists(base + ".idx"):
+            _truncate_torn_tail(base + ".idx")
+        self.index = open(base + ".idx", 'a')
+
+    def add(self, rel_path, data, st):
+        """Appends one file's bytes; returns its index entry (with "pack" set) once flushed."""
+        stored, compression = data, None
+        if data:
+            packed = zlib.compress(data, COMPRESS_LEVEL)
+            if len(packed) <= len(data) * MIN_SAVING:
+                stored, compression = packed, "zlib"
+        if self.data.tell() and self.data.tell() + len(stored) > self.max_bytes:
+            self.flush()
+            self.close()
+            self._open(self.seq + 1)
+        entry = {"path": rel_path, "offset": self.data.tell(), "length": len(stored), "size": len(data),
+                 "sha256": hashlib.sha256(data).hexdigest(), "compression": compression,
+                 "mode": st.st_mode & 0o7777, "mtime_ns": st.st_mtime_ns, "written_ns": time.time_ns()}
+        self.data.write(stored)
+        self.pending.append(entry)
+        return dict(entry, pack=self.pack_path)
+
+    def flush(self, fsync=False):
+        self.data.flush()
+        if fsync:
+            os.fsync(self.data.fileno())
+        for entry in self.pending:
+            self.index.write(json.dumps(entry) + "\n")
+        self.pending = []
+        self.index.flush()
+        if fsync:
+            os.fsync(self.index.fileno())
+
+    def close(self):
+        self.flush()
+        self.data.close()
+        self.index.close()
+
+
+def _truncate_torn_tail(path):
+    # A crash mid-flush leaves a partial last index line; drop it before appending
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def read_record(fd, entry):
+    """Reads and decompresses one record from an open pack file descriptor."""
+    stored = os.pread(fd, entry["length"], entry["offset"])
+    if len(stored) != entry["length"]:
+        raise ValueError(f"Pack truncated at {entry['path']}")
+    return zlib.decompress(stored) if entry["compression"] == "zlib" else stored
+
+
+def load_index(idx_path):
+    entries = []
+    with open(idx_path) as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # Torn line from an interrupted write; later lines are still good
+    return entries
+
+
+class PackReader:
+    """Random access to the packed files of one snapshot, by path relative to the snapshot."""
+
+    def __init__(self, snapshot_dir):
+        self.dir = os.path.join(snapshot_dir, PACK_DIR)
+        self.entries = {}  # path -> (pack path, entry); the most recently written entry for a path wins
+        self.fds = {}
+        if not os.path.isdir(self.dir):
+            return
+        for name in sorted(os.listdir(self.dir)):
+            if name.endswith(".idx"):
+                pack_path = os.path.join(self.dir, name[:-4] + ".pack")
+                for entry in load_index(os.path.join(self.dir, name)):
+                    current = self.entries.get(entry["path"])
+                    if current is None or entry.get("written_ns", 0) >= current[1].get("written_ns", 0):
+                        self.entries[entry["path"]] = (pack_path, entry)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def read(self, path, verify=True):
+        pack_path, entry = self.entries[path]
+        fd = self.fds.get(pack_path)
+        if fd is None:
+            fd = self.fds[pack_path] = os.open(pack_path, os.O_RDONLY)
+        data = read_record(fd, entry)
+        if verify and hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Hash mismatch for {path} in {pack_path}")
+        return data
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def extract(snapshot_dir, out_dir, verify=False):
+    """
+    Restores every packed file of a snapshot under out_dir with its mode and mtime.
+    Records are read pack by pack in offset order, so each pack is one sequential
+    read. Returns the number of files written.
+    """
+    with PackReader(snapshot_dir) as reader:
+        by_pack = {}
+        for pack_path, entry in reader.entries.values():
+            by_pack.setdefault(pack_path, []).append(entry)
+        for parent in {os.path.dirname(path) for path in reader}:
+            os.makedirs(os.path.join(out_dir, parent), exist_ok=True)
+
+        count = 0
+        for pack_path, entries in by_pack.items():
+            entries.sort(key=lambda e: e["offset"])
+            with open(pack_path, 'rb') as f:
+                for entry in entries:
+                    f.seek(entry["offset"])
+                    data = f.read(entry["length"])
+                    if entry["compression"] == "zlib":
+                        data = zlib.decompress(data)
+                    if verify and hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                        raise ValueError(f"Hash mismatch for {entry['path']} in {pack_path}")
+                    target = os.path.join(out_dir, entry["path"])
+                    with open(target, 'wb') as out:
+                        out.write(data)
+                    os.chmod(target, entry["mode"])
+                    os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+                    count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and restore backup pack files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="List packed files")
+    p_list.add_argument("snapshot")
+    p_cat = sub.add_parser("cat", help="Write one packed file to stdout")
+    p_cat.add_argument("snapshot")
+    p_cat.add_argument("path", help="Path relative to the snapshot")
+    p_extract = sub.add_parser("extract", help="Restore all packed files")
+    p_extract.add_argument("snapshot")
+    p_extract.add_argument("out_dir")
+    p_extract.add_argument("--verify", action="store_true", help="Check every file's SHA-256")
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        print(f"Extracted {extract(args.snapshot, args.out_dir, verify=args.verify)} files to {args.out_dir}")
+        return
+    with PackReader(args.snapshot) as reader:
+        if args.command == "list":
+            for path in sorted(reader):
+                pack_path, entry = reader.entries[path]
+                stored = f" ({entry['length']} stored)" if entry["compression"] else ""
+                print(f"{entry['size']:>12}{stored}  {path}  [{os.path.basename(pack_path)}]")
+        elif args.command == "cat":
+            if args.path not in reader:
+                sys.exit(f"{args.path} is not in {args.snapshot}")
+            sys.stdout.buffer.write(reader.read(args.path))
+
+
+if __name__ == "__main__":
+    main()
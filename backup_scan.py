@@ -0,0 +1,57 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# mtime is st_mtime_ns; inode lets the manifest notice replaced files
+ScanEntry = namedtuple("ScanEntry", ["path", "size", "mtime", "inode"])
+
+
+def list_dirs(path):
+    """Top-level directories of path, in directory order like os.listdir, using scandir's cached file type."""
+    with os.scandir(path) as it:
+        return [entry.path for entry in it if entry.is_dir()]
+
+
+def _scan_dir(path):
+    dirs, files = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files.append(ScanEntry(entry.path, st.st_size, st.st_mtime_ns, st.st_ino))
+                except OSError as e:
+                    print(f"Skipping {entry.path}: {e}")
+    except OSError as e:
+        print(f"Skipping {path}: {e}")
+    return dirs, files
+
+
+def scan_tree(src_dir, dst_dir=None, threads=4):
+    """
+    Generator of ScanEntry(path, size, mtime, inode) for every file under src_dir.
+
+    Directories are listed with os.scandir, whose entries already know their type,
+    so only files need a stat. Subdirectories are scanned on a thread pool, keeping
+    several metadata requests queued on slow USB media; files are yielded as each
+    directory finishes, so order follows completion, not the tree. With dst_dir set,
+    the matching destination directories are created one level at a time as each
+    parent is scanned, before any of its files are yielded.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = {pool.submit(_scan_dir, src_dir)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirs, files = future.result()
+                if dst_dir is not None:
+                    for sub in dirs:
+                        try:
+                            os.mkdir(os.path.join(dst_dir, os.path.relpath(sub, src_dir)))
+                        except FileExistsError:
+                            pass
+                pending.update(pool.submit(_scan_dir, sub) for sub in dirs)
+                yield from files
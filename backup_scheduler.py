@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+
+
+def physical_device(path):
+    """Name of the disk holding path (e.g. "sdb" for /dev/sdb1), so partitions of one stick share a queue."""
+    dev = os.stat(path).st_dev
+    sys_path = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+    if not os.path.exists(sys_path):
+        return f"{os.major(dev)}:{os.minor(dev)}"
+    if os.path.exists(os.path.join(sys_path, "partition")):
+        sys_path = os.path.dirname(sys_path)
+    return os.path.basename(sys_path)
+
+
+class _Device:
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.bytes = 0
+        self.since = time.monotonic()
+        self.last_rate = None
+        self.step = 1
+
+
+class IOScheduler:
+    """
+    Gates work submitted to a shared process pool: each source device gets its own
+    limit on tasks in flight, and all devices together are capped at dest_limit
+    since every task writes to the same destination.
+
+    Device limits adapt by hill climbing. Every adapt_seconds the device's measured
+    throughput (weigh(result) bytes per second) is compared with the previous
+    interval; the limit keeps moving one step in the same direction while that
+    helps by more than 5% and reverses otherwise. A USB stick settles at one or
+    two readers, while an NVMe drive climbs to device_max.
+    """
+
+    def __init__(self, pool, dest_limit, weigh, device_start=2, device_max=4, adapt_seconds=10.0):
+        self.pool = pool
+        self.dest_limit = dest_limit
+        self.weigh = weigh
+        self.device_start = device_start
+        self.device_max = device_max
+        self.adapt_seconds = adapt_seconds
+        self.dest_in_flight = 0
+        self.devices = {}
+        self.cond = threading.Condition()
+
+    def _free(self, device):
+        d = self.devices.setdefault(device, _Device(min(self.device_start, self.device_max)))
+        return d.in_flight < d.limit and self.dest_in_flight < self.dest_limit
+
+    def acquire(self, device, block=True):
+        """Reserves a slot on device; returns False instead of waiting when block is False."""
+        with self.cond:
+            while not self._free(device):
+                if not block:
+                    return False
+                self.cond.wait()
+            self.devices[device].in_flight += 1
+            self.dest_in_flight += 1
+            return True
+
+    def release(self, device, nbytes=0):
+        with self.cond:
+            d = self.devices[device]
+            d.in_flight -= 1
+            self.dest_in_flight -= 1
+            d.bytes += nbytes
+            self._adapt(device, d)
+            self.cond.notify_all()
+
+    def depths(self):
+        """{device: (batches in flight, current limit)}"""
+        with self.cond:
+            return {name: (d.in_flight, d.limit) for name, d in self.devices.items()}
+
+    def submit(self, device, func, args, callback):
+        """Runs func(*args) in the pool on an acquired slot, freed when it finishes; callback gets the result or exception."""
+        def done(result):
+            self.release(device, self.weigh(result))
+            callback(result)
+
+        def failed(error):
+            self.release(device)
+            callback(error)
+
+        self.pool.apply_async(func, args, callback=done, error_callback=failed)
+
+    def _adapt(self, device, d):
+        now = time.monotonic()
+        elapsed = now - d.since
+        if elapsed < self.adapt_seconds:
+            return
+        if not d.bytes:
+            d.since = now  # Idle or only hard links: nothing to learn from
+            return
+        rate = d.bytes / elapsed
+        if d.last_rate is not None and rate <= d.last_rate * 1.05:
+            d.step = -d.step  # The last change didn't help, head back the other way
+        limit = min(max(d.limit + d.step, 1), self.device_max)
+        if limit != d.limit:
+            print(f"{device}: {rate / 1e6:.1f} MB/s, now {limit} parallel readers")
+        d.limit, d.last_rate, d.bytes, d.since = limit, rate, 0, now
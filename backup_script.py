@@ -1,12 +1,22 @@
 import os
-import shutil
 import time
 import json
+import queue
 import hashlib
 import argparse
+import threading
 import multiprocessing
 from datetime import datetime
+from collections import Counter
 from subprocess import check_output
+import backup_copy
+import backup_store
+import backup_pack
+from backup_manifest import Manifest
+from backup_journal import Journal
+from backup_scheduler import IOScheduler, physical_device
+from backup_metrics import Metrics, summary
+from backup_scan import scan_tree, list_dirs
 
 """
 # First get the UUID information of the mounted drives/flash
@@ -23,6 +33,30 @@ python3 backup_tool.py --force
 
 # Limit CPU usage to 4 processes
 python3 backup_tool.py --max-procs 4
+
+# All drives are backed up at once; allow at most 2 readers per source disk and 3 writers to the destination
+python3 backup_tool.py --device-procs 2 --dest-procs 3
+
+# Flush each copy to the device and re-read it from the media before comparing
+python3 backup_tool.py --fsync-verify
+
+# Copy every file again instead of hard-linking files unchanged since the last run
+python3 backup_tool.py --full
+
+# Deduplicate: keep each distinct file once under DESTINATION_DIR/objects, hard-linked into snapshots
+python3 backup_tool.py --dedup
+
+# Free objects no snapshot references any more (e.g. after deleting old snapshot folders)
+python3 backup_tool.py --gc
+
+# Pack files under PACK_MAX_FILE into append-only pack files (restore with backup_pack.py extract)
+python3 backup_tool.py --pack
+
+# Copy inside the kernel (copy_file_range/sendfile) and verify through mmap
+python3 backup_tool.py --copy-engine zerocopy
+
+# Old behaviour: shutil.copy2 and then hash source and destination separately
+python3 backup_tool.py --copy-engine legacy
 """
 
 # ===== CONFIG =====
@@ -35,6 +69,20 @@ ALLOWED_HOURS = (1, 11)
 STATE_FILE = "backup_state.json"
 RETRY_LIMIT = 3
 LOG_DIR = "backup_logs"
+JOURNAL_DIR = os.path.join(LOG_DIR, "journal")  # Per-directory progress, removed once a directory completes
+METRICS_JSON = os.path.join(LOG_DIR, "backup_metrics.json")  # Live per-device metrics, refreshed while running
+METRICS_PROM = os.path.join(LOG_DIR, "backup.prom")  # Same, for node_exporter's textfile collector
+METRICS_INTERVAL = 10  # Seconds between refreshes
+MANIFEST_FILE = "manifest.sqlite"  # Kept in DESTINATION_DIR next to the snapshots it indexes
+MANIFEST_MATCH_INODE = True  # Set False for FAT/exFAT cards, whose inode numbers change on every mount
+STORE_DIR = os.path.join(DESTINATION_DIR, "objects")  # Content-addressed store used by --dedup
+BATCH_FILES = 256  # Small files are sent to workers in batches of up to this many files...
+BATCH_BYTES = 64 * 1024 * 1024  # ...or this many bytes
+LARGE_FILE = 256 * 1024 * 1024  # Files this size or bigger go out alone, ahead of the batch being filled
+PACK_MAX_FILE = 1024 * 1024  # --pack: files smaller than this go into the snapshot's pack files
+SCAN_THREADS = 4  # Directories listed in parallel per source tree
+DEVICE_MAX_READERS = 4  # Upper bound for each source disk's adaptive reader count
+DEST_MAX_WRITERS = 4  # Batches writing to DESTINATION_DIR at once, across all drives
 
 os.makedirs(LOG_DIR, exist_ok=True)
 
@@ -44,7 +92,18 @@ def parse_args():
     parser = argparse.ArgumentParser(description="USB Drive Backup Utility")
     parser.add_argument("--dry-run", action="store_true", help="Simulate backup without copying")
     parser.add_argument("--force", action="store_true", help="Run regardless of time window")
-    parser.add_argument("--max-procs", type=int, default=min(8, multiprocessing.cpu_count()), help="Max parallel workers")
+    parser.add_argument("--max-procs", type=int, default=min(8, multiprocessing.cpu_count()), help="Max parallel workers (shared by all drives)")
+    parser.add_argument("--device-procs", type=int, default=DEVICE_MAX_READERS, help="Max parallel readers per source disk")
+    parser.add_argument("--dest-procs", type=int, default=DEST_MAX_WRITERS, help="Max parallel writers to the destination")
+    parser.add_argument("--copy-engine", choices=list(backup_copy.ENGINES), default="fused",
+                        help="fused: hash while copying, then one read-back; zerocopy: kernel copy_file_range/sendfile "
+                             "with mmap hashing for files that fit in the page cache, fused for larger ones; "
+                             "legacy: copy2 then hash both files")
+    parser.add_argument("--full", action="store_true", help="Copy every file even if the manifest says it is unchanged")
+    parser.add_argument("--dedup", action="store_true", help="Store contents once by SHA-256 in STORE_DIR and hard-link snapshots to them")
+    parser.add_argument("--pack", action="store_true", help="Append small files to per-snapshot pack files instead of copying them one by one")
+    parser.add_argument("--gc", action="store_true", help="After the backup, delete store objects no snapshot links to")
+    parser.add_argument("--fsync-verify", action="store_true", help="fused/zerocopy engines: fsync each copy and verify it from the device, not the page cache")
     return parser.parse_args()
 
 
@@ -53,8 +112,11 @@ def parse_args():
 def current_hour():
     return datetime.now().hour
 
+def in_allowed_window():
+    return ALLOWED_HOURS[0] <= current_hour() < ALLOWED_HOURS[1]
+
 def wait_until_allowed(force=False):
-    while not force and not (ALLOWED_HOURS[0] <= current_hour() < ALLOWED_HOURS[1]):
+    while not force and not in_allowed_window():
         print("Waiting for allowed backup window...")
         time.sleep(600)
 
@@ -69,108 +131,376 @@ def get_mounted_uuid_paths():
                 mount_map[uuid.strip()] = mount.strip()
     return {uuid: mount_map.get(uuid) for uuid in UUIDS if uuid in mount_map}
 
-def compute_sha256(file_path):
-    hasher = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+def copy_file(src_file, dst_file, copy_opts):
+    # Never write through an existing file: it may be a hard link into an older snapshot
+    if os.path.lexists(dst_file):
+        os.remove(dst_file)
+    return backup_copy.ENGINES[copy_opts["engine"]](src_file, dst_file, fsync=copy_opts["fsync"])
+
+def link_file(existing, dst_file):
+    if os.path.lexists(dst_file):
+        if os.path.samefile(existing, dst_file):
+            return  # Same snapshot backed up twice in one day
+        os.remove(dst_file)
+    os.link(existing, dst_file)
+
+def store_and_link(src_file, dst_file, copy_opts):
+    # Hash first: content the store already has costs one read and no writes
+    sha256 = backup_copy.hash_file(src_file)
+    obj = backup_store.object_path(copy_opts["store"], sha256)
+    status = "deduplicated"
+    if not os.path.exists(obj):
+        tmp = backup_store.temp_path(copy_opts["store"], sha256)
+        src_hash, dst_hash = copy_file(src_file, tmp, copy_opts)
+        if not src_hash == dst_hash == sha256:
+            os.remove(tmp)
+            raise ValueError("Hash mismatch")
+        backup_store.commit(tmp, obj)
+        status = "stored"
+    link_file(obj, dst_file)
+    return status, sha256
 
 def verify_and_copy(args):
-    src_file, dst_file, dry_run = args
+    # Engines report the seconds they spend copying and hashing through backup_copy.timed
+    backup_copy.stage_times = times = {}
+    try:
+        result = _verify_and_copy(args)
+    finally:
+        backup_copy.stage_times = None
+    if times:
+        result["copy_seconds"] = round(times.get("copy", 0.0), 6)
+        result["hash_seconds"] = round(times.get("hash", 0.0), 6)
+    return result
+
+def _verify_and_copy(args):
+    src_file, dst_file, dry_run, copy_opts, meta, previous = args
+    result = {"file": dst_file, "source": src_file, "size": meta[0], "mtime_ns": meta[1], "inode": meta[2]}
+    if copy_opts["pack"] and not dry_run:
+        os.makedirs(os.path.dirname(dst_file), exist_ok=True)  # Pack mode only creates directories that get real files
+
+    # Unchanged since the last backup: hard-link the previous snapshot's copy
+    if previous is not None:
+        if dry_run:
+            return dict(result, status="simulated_link")
+        try:
+            link_file(previous[0], dst_file)
+            return dict(result, status="linked", sha256=previous[1])
+        except OSError as e:
+            print(f"Could not link {dst_file} to {previous[0]} ({e}), copying instead")
+
     for attempt in range(RETRY_LIMIT):
         try:
             if dry_run:
-                return {"file": dst_file, "status": "simulated"}
-            shutil.copy2(src_file, dst_file)
-            if compute_sha256(src_file) == compute_sha256(dst_file):
-                return {"file": dst_file, "status": "verified"}
+                return dict(result, status="simulated")
+            if copy_opts["store"]:
+                status, sha256 = store_and_link(src_file, dst_file, copy_opts)
+                return dict(result, status=status, sha256=sha256, retries=attempt)
+            src_hash, dst_hash = copy_file(src_file, dst_file, copy_opts)
+            if src_hash == dst_hash:
+                return dict(result, status="verified", sha256=src_hash, retries=attempt)
             else:
                 raise ValueError("Hash mismatch")
         except Exception as e:
             print(f"Retry {attempt+1}/{RETRY_LIMIT} failed for {src_file}: {e}")
             time.sleep(1)
-    return {"file": dst_file, "status": "failed"}
-
-def load_state():
-    return json.load(open(STATE_FILE)) if os.path.exists(STATE_FILE) else {"drive_index": 0, "dir_index": 0}
+    return dict(result, status="failed", retries=RETRY_LIMIT)
+
+_state_lock = threading.Lock()
+
+def load_state(mounted_drives):
+    """Per-drive progress, {"drives": {uuid: {"dir_index": n, "done": bool}}}; the old sequential format is converted."""
+    state = json.load(open(STATE_FILE)) if os.path.exists(STATE_FILE) else {"drives": {}}
+    if "drive_index" in state:
+        drives = {}
+        for i, (uuid, _) in enumerate(mounted_drives):
+            if i < state["drive_index"]:
+                drives[uuid] = {"dir_index": 0, "done": True}
+            elif i == state["drive_index"]:
+                drives[uuid] = {"dir_index": state["dir_index"], "done": False}
+        state = {"drives": drives}
+    return state
 
 def save_state(state):
     with open(STATE_FILE, 'w') as f:
         json.dump(state, f)
 
-def log_results(date_str, results, dry_run=False):
+def update_state(state, uuid, **progress):
+    # Drive threads share one state file
+    with _state_lock:
+        state["drives"][uuid].update(progress)
+        save_state(state)
+
+def log_results(date_str, results, dry_run=False, name=None):
+    """Writes results to the txt/json logs as they arrive and returns a count per status."""
     tag = "dry_run" if dry_run else "backup"
+    if name:
+        tag += "_" + name  # One log per source directory, since drives run side by side
     txt_log = os.path.join(LOG_DIR, f"{tag}_{date_str}.txt")
     json_log = os.path.join(LOG_DIR, f"{tag}_{date_str}.json")
 
+    counts = Counter()
     with open(txt_log, 'w') as f_txt, open(json_log, 'w') as f_json:
         f_txt.write(f"Backup Date: {date_str}\n\n")
+        f_json.write("[")
         for result in results:
             f_txt.write(f"{result['status'].upper()}: {result['file']}\n")
-        json.dump(results, f_json, indent=2)
-
-def backup_directory(src_dir, dst_base, date_str, dry_run, max_procs):
+            f_json.write(("," if counts else "") + "\n  " + json.dumps(result))
+            counts[result["status"]] += 1
+        f_json.write("\n]\n")
+    return counts
+
+def iter_jobs(src_dir, dst_dir, dry_run, copy_opts, manifest=None, full=False, skip=()):
+    # Pack mode leaves directory creation to the workers, for the few files that aren't packed
+    make_dirs = None if dry_run or copy_opts["pack"] else dst_dir
+    # A same-day rerun finds files already packed into this snapshot; unchanged ones are not packed twice
+    packed = {}
+    if copy_opts["pack"] and not full:
+        with backup_pack.PackReader(dst_dir) as reader:
+            packed = {path: (entry["size"], entry["mtime_ns"]) for path, (_, entry) in reader.entries.items()}
+    for src_file, size, mtime, inode in scan_tree(src_dir, make_dirs, threads=SCAN_THREADS):
+        if src_file in skip:
+            continue
+        rel_path = os.path.relpath(src_file, src_dir)
+        if packed.get(rel_path) == (size, mtime):
+            continue
+        dst_file = os.path.join(dst_dir, rel_path)
+        previous = manifest.lookup(src_file, size, mtime, inode) if manifest and not full else None
+        yield (src_file, dst_file, dry_run, copy_opts, (size, mtime, inode), previous)
+
+def batch_jobs(jobs):
+    batch, batch_bytes = [], 0
+    for job in jobs:
+        size = 0 if job[5] is not None else job[4][0]  # Hard links move no data
+        if size >= LARGE_FILE:
+            yield [job]
+            continue
+        batch.append(job)
+        batch_bytes += size
+        if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+            yield batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield batch
+
+def pack_files(jobs, copy_opts):
+    """
+    Appends small files to this worker's pack in the snapshot, then verifies each
+    record by reading it back from the pack. Records that fail are packed again.
+    """
+    snapshot = copy_opts["snapshot"]
+    results, pending = [], jobs
+    for attempt in range(RETRY_LIMIT):
+        writer = backup_pack.PackWriter(snapshot)
+        written = []
+        for job in pending:
+            src_file, dst_file = job[0], job[1]
+            start = time.perf_counter()
+            try:
+                with open(src_file, 'rb') as f:
+                    data = f.read()
+                entry = writer.add(os.path.relpath(dst_file, snapshot), data, os.stat(src_file))
+                written.append((job, entry, time.perf_counter() - start))
+            except OSError as e:
+                print(f"Retry {attempt+1}/{RETRY_LIMIT} failed for {src_file}: {e}")
+                written.append((job, None, 0.0))
+        writer.flush(fsync=copy_opts["fsync"])
+        writer.close()
+
+        pending, fds = [], {}
+        try:
+            for job, entry, copy_seconds in written:
+                start = time.perf_counter()
+                if entry is not None:
+                    if entry["pack"] not in fds:
+                        fds[entry["pack"]] = os.open(entry["pack"], os.O_RDONLY)
+                    data = backup_pack.read_record(fds[entry["pack"]], entry)
+                if entry is None or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                    pending.append(job)
+                    continue
+                results.append(dict(pack_result(job, "packed", attempt), sha256=entry["sha256"], pack=entry["pack"],
+                                    offset=entry["offset"], copy_seconds=round(copy_seconds, 6),
+                                    hash_seconds=round(time.perf_counter() - start, 6)))
+        finally:
+            for fd in fds.values():
+                os.close(fd)
+        if not pending:
+            break
+    return results + [pack_result(job, "failed", RETRY_LIMIT) for job in pending]
+
+def pack_result(job, status, retries):
+    src_file, dst_file, _, _, meta, _ = job
+    return {"file": dst_file, "source": src_file, "size": meta[0], "mtime_ns": meta[1], "inode": meta[2],
+            "status": status, "retries": retries}
+
+def copy_batch(batch):
+    copy_opts = batch[0][3]
+    if not copy_opts["pack"] or batch[0][2]:
+        return [verify_and_copy(job) for job in batch]
+    small = [job for job in batch if job[5] is None and job[4][0] < PACK_MAX_FILE]
+    rest = [job for job in batch if not (job[5] is None and job[4][0] < PACK_MAX_FILE)]
+    return [verify_and_copy(job) for job in rest] + (pack_files(small, copy_opts) if small else [])
+
+def bytes_read(results):
+    # What the scheduler measures device throughput by; hard links read nothing
+    if isinstance(results, BaseException):
+        return 0
+    return sum(r["size"] for r in results if r["status"] in ("verified", "stored", "deduplicated", "packed"))
+
+def backup_directory(src_dir, dst_base, date_str, dry_run, scheduler, device, copy_opts, manifest=None, full=False,
+                     skip=(), stop=None, metrics=None):
+    """
+    Generator that walks src_dir and yields each file's result as soon as its batch
+    finishes. Batches go to the shared pool through scheduler while the walk is
+    still running, as many at a time as the source device's limit allows, so memory
+    stays flat however many files there are. The walk and manifest lookups stay on
+    this thread; workers only copy.
+
+    Sources in skip are left alone. Once stop() returns True no new batches are
+    started; the generator's return value is False if it stopped before the walk ended.
+    """
     dst_dir = os.path.join(dst_base, os.path.basename(src_dir) + "_" + date_str)
     if not dry_run:
         os.makedirs(dst_dir, exist_ok=True)
+    copy_opts = dict(copy_opts, snapshot=dst_dir)
+
+    batches = batch_jobs(iter_jobs(src_dir, dst_dir, dry_run, copy_opts, manifest, full, skip))
+    done = queue.Queue()
+    in_flight = 0
+    exhausted = False
+    while True:
+        # Fill every free slot on this device; only wait for one when none of ours is running
+        while not exhausted and not (stop and stop()) and scheduler.acquire(device, block=not in_flight):
+            batch = next(batches, None)
+            if batch is None:
+                scheduler.release(device)
+                exhausted = True
+                break
+            scheduler.submit(device, copy_batch, (batch,), done.put)
+            in_flight += 1
+        if not in_flight:
+            break
+        results = done.get()
+        in_flight -= 1
+        if isinstance(results, BaseException):
+            raise results
+        if manifest and not dry_run:
+            manifest.record(results)
+        if metrics:
+            for result in results:
+                metrics.observe(device, result, bytes_read([result]))
+        yield from results
+    return exhausted
+
+def journal_path(src_dir):
+    return os.path.join(JOURNAL_DIR, hashlib.sha1(src_dir.encode()).hexdigest()[:16] + ".jsonl")
+
+def run_directory(src_dir, args, copy_opts, manifest, scheduler, device, metrics=None):
+    """
+    Backs up one directory through its journal. Returns False if the backup window
+    closed first; the journal is kept so the next call picks up where this one stopped.
+    """
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    if args.dry_run:
+        results = backup_directory(src_dir, DESTINATION_DIR, date_str, True, scheduler, device, copy_opts, manifest, args.full,
+                                   metrics=metrics)
+        counts = log_results(date_str, results, dry_run=True, name=os.path.basename(src_dir))
+        print(", ".join(f"{n} {status}" for status, n in counts.items()) or "No files")
+        return True
+
+    journal = Journal(journal_path(src_dir), date_str)
+    skip = journal.completed()
+    if skip:
+        print(f"Resuming {journal.date_str} snapshot, {len(skip)} files already done")
+    results = backup_directory(src_dir, DESTINATION_DIR, journal.date_str, False, scheduler, device, copy_opts,
+                               manifest, args.full, skip=skip, stop=lambda: not args.force and not in_allowed_window(),
+                               metrics=metrics)
+    try:
+        while True:
+            journal.append(next(results))
+    except StopIteration as end:
+        finished = end.value
+    finally:
+        journal.close()
+
+    if not finished:
+        print(f"Backup window closed, pausing {src_dir}")
+        return False
+    counts = log_results(journal.date_str, journal.entries(), name=os.path.basename(src_dir))
+    print(", ".join(f"{n} {status}" for status, n in counts.items()) or "No files")
+    journal.remove()
+    return True
+
+def backup_drive(uuid, mount_point, state, args, copy_opts, manifest, scheduler, metrics=None):
+    if not mount_point or not os.path.exists(mount_point):
+        print(f"Drive {uuid} not found. Skipping...")
+        update_state(state, uuid, dir_index=0, done=True)
+        return
+
+    device = physical_device(mount_point)
+    all_dirs = list_dirs(mount_point)
+
+    for i in range(state["drives"][uuid]["dir_index"], len(all_dirs)):
+        src_dir = all_dirs[i]
+        finished = False
+        while not finished:
+            wait_until_allowed(force=args.force)
+            print(f"{'Simulating' if args.dry_run else 'Backing up'} {src_dir} ({device})...")
+            finished = run_directory(src_dir, args, copy_opts, manifest, scheduler, device, metrics)
 
-    jobs = []
-    for root, _, files in os.walk(src_dir):
-        rel_path = os.path.relpath(root, src_dir)
-        dst_root = os.path.join(dst_dir, rel_path)
-        if not dry_run:
-            os.makedirs(dst_root, exist_ok=True)
-        for file in files:
-            src_file = os.path.join(root, file)
-            dst_file = os.path.join(dst_root, file)
-            jobs.append((src_file, dst_file, dry_run))
-
-    with multiprocessing.Pool(processes=max_procs) as pool:
-        results = pool.map(verify_and_copy, jobs)
+        # Save state after each directory
+        update_state(state, uuid, dir_index=i + 1)
 
-    return results
+    update_state(state, uuid, dir_index=0, done=True)
 
 
 # ===== MAIN =====
 
 def main():
     args = parse_args()
-    state = load_state()
     mounted_paths = get_mounted_uuid_paths()
     mounted_drives = list(mounted_paths.items())
-
-    while state["drive_index"] < len(mounted_drives):
-        wait_until_allowed(force=args.force)
-
-        uuid, mount_point = mounted_drives[state["drive_index"]]
-        if not mount_point or not os.path.exists(mount_point):
-            print(f"Drive {uuid} not found. Skipping...")
-            state["drive_index"] += 1
-            state["dir_index"] = 0
-            save_state(state)
-            continue
-
-        all_dirs = [os.path.join(mount_point, d) for d in os.listdir(mount_point)
-                    if os.path.isdir(os.path.join(mount_point, d))]
-
-        for i in range(state["dir_index"], len(all_dirs)):
-            wait_until_allowed(force=args.force)
-
-            src_dir = all_dirs[i]
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            print(f"{'Simulating' if args.dry_run else 'Backing up'} {src_dir}...")
-            results = backup_directory(src_dir, DESTINATION_DIR, date_str, args.dry_run, args.max_procs)
-            log_results(date_str, results, dry_run=args.dry_run)
-
-            # Save state after each directory
-            state["dir_index"] += 1
-            save_state(state)
-
-        state["drive_index"] += 1
-        state["dir_index"] = 0
-        save_state(state)
-
+    state = load_state(mounted_drives)
+    copy_opts = {"engine": args.copy_engine, "fsync": args.fsync_verify, "store": STORE_DIR if args.dedup else None,
+                 "pack": args.pack}
+    manifest_path = os.path.join(DESTINATION_DIR, MANIFEST_FILE)
+    manifest = None
+    if not args.dry_run or os.path.exists(manifest_path):
+        manifest = Manifest(manifest_path, match_inode=MANIFEST_MATCH_INODE)
+
+    drives = [(uuid, mount_point) for uuid, mount_point in mounted_drives
+              if not state["drives"].get(uuid, {}).get("done")]
+    for uuid, _ in drives:
+        state["drives"].setdefault(uuid, {"dir_index": 0, "done": False})
+
+    # One thread per drive, all feeding the same worker pool through the scheduler
+    errors = []
+    def run_drive(uuid, mount_point):
+        try:
+            backup_drive(uuid, mount_point, state, args, copy_opts, manifest, scheduler, metrics)
+        except Exception as e:
+            print(f"Backup of drive {uuid} failed: {e}")
+            errors.append(e)
+
+    with multiprocessing.Pool(processes=args.max_procs) as pool:
+        scheduler = IOScheduler(pool, args.dest_procs, bytes_read, device_max=args.device_procs)
+        metrics = Metrics(METRICS_JSON, METRICS_PROM, scheduler, interval=METRICS_INTERVAL)
+        metrics.start()
+        threads = [threading.Thread(target=run_drive, args=drive, name=drive[0]) for drive in drives]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            print(summary(metrics.stop()))
+    if errors:
+        raise errors[0]
+
+    if manifest:
+        manifest.close()
+    if args.gc:
+        removed, freed = backup_store.collect_garbage(STORE_DIR, dry_run=args.dry_run)
+        print(f"Garbage collection {'would remove' if args.dry_run else 'removed'} {removed} objects ({freed / 1e6:.1f} MB)")
     print("✅ Done!" if not args.dry_run else "✅ Dry run complete!")
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+import os
+
+"""
+Content-addressed object store for backup_script. Each distinct file content is
+kept once as <store>/<sha[:2]>/<sha[2:]> and snapshot trees hard-link to it, so
+an object's link count tells how many snapshot files still reference it.
+"""
+
+TMP_DIR = "tmp"
+
+
+def object_path(store_dir, sha256):
+    return os.path.join(store_dir, sha256[:2], sha256[2:])
+
+
+def temp_path(store_dir, sha256):
+    tmp_dir = os.path.join(store_dir, TMP_DIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+    return os.path.join(tmp_dir, f"{sha256}.{os.getpid()}")
+
+
+def commit(tmp, obj):
+    # Rename into place so a half-written object is never visible; two workers
+    # storing the same content race harmlessly since both files are identical
+    os.makedirs(os.path.dirname(obj), exist_ok=True)
+    os.replace(tmp, obj)
+
+
+def collect_garbage(store_dir, dry_run=False):
+    """
+    Deletes objects no snapshot links to any more (link count 1) and temp files
+    left by interrupted copies. Run it only while no backup is writing to the store.
+    Returns (objects removed, bytes freed).
+    """
+    removed = freed = 0
+    if not os.path.isdir(store_dir):
+        return removed, freed
+    tmp_dir = os.path.join(store_dir, TMP_DIR)
+    for root, _, files in os.walk(store_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            st = os.lstat(path)
+            if root == tmp_dir or st.st_nlink == 1:
+                if not dry_run:
+                    os.remove(path)
+                removed += 1
+                freed += st.st_size
+    return removed, freed
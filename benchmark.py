@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import importlib
+import multiprocessing
+import matplotlib
+matplotlib.use("Agg")  # Headless: never open a window or call into a GUI toolkit
+import frame_pipeline
+import parallel_render
+import stream_encoder
+from tariff_engine import SECTOR_PERCENTAGES, ELASTICITIES
+
+"""
+# Run every benchmark with 120 frames and print the table
+python3 benchmark.py --frames 120
+
+# Record a baseline, then check a later build against it (exit code 1 on regression)
+python3 benchmark.py --save bench_baseline.json
+python3 benchmark.py --compare bench_baseline.json --tolerance 0.15
+"""
+
+STAGES = ("simulate", "draw", "rasterize", "encode", "write")
+
+
+# ===== BENCHMARKS =====
+# Each gets the imported script and returns (setup, states, args, output extension, fps)
+# after doing its simulation step, or None when there is nothing to render
+
+def bench_tariff_video(module, frames):
+    quarters = module.simulate_tariff_impact(0.20, SECTOR_PERCENTAGES, ELASTICITIES, cache=False)
+    n = len(next(iter(quarters.values())))
+    return module._frame_renderer, [i % n for i in range(frames)], (quarters, 640, 480), ".mp4", 2
+
+def bench_gdp_projection(module, frames):
+    return module.month_renderer, [i % module.total_months for i in range(frames)], (), ".mp4", module.fps
+
+def bench_fft(module, frames):
+    return module.frame_renderer, range(frames), (), ".gif", 20
+
+def bench_clt(module, frames):
+    return module.frame_renderer, range(frames), (module.sample_means(frames),), ".gif", 10
+
+def bench_pi(module, frames):
+    return module.archimedes_renderer, range(3, frames + 3), (), ".gif", 1
+
+def bench_coffee(module, frames):
+    _, _, demand, price = module.generate_coffee_data(num_points=frames)
+    return module.regression_renderer, range(frames), (demand, price), ".gif", 10
+
+def bench_tariff_sweep(module, frames):
+    module.sweep([0.1, 0.2, 0.3], SECTOR_PERCENTAGES, ELASTICITIES, draws=max(1, frames * 100), elasticity_noise=0.1, workers=1)
+    return None
+
+BENCHMARKS = {
+    "tariff_video": ("GDPChessOver4YearsDynamicCharting", bench_tariff_video),
+    "gdp_projection": ("TariffsGDPsimulation", bench_gdp_projection),
+    "fft": ("fft_algo_demo", bench_fft),
+    "clt": ("normal_distribution_demo", bench_clt),
+    "pi": ("pi_day_archimedes", bench_pi),
+    "coffee": ("regression_fic_coffee", bench_coffee),
+    "tariff_sweep": ("tariff_sweep", bench_tariff_sweep),
+}
+
+
+# ===== RUNNER =====
+
+class _TimedSetup:
+    # Wraps draw() so artist updates can be told apart from rasterization
+    def __init__(self, setup):
+        self.setup = setup
+
+    def __call__(self, *args):
+        draw = self.setup(*args)
+
+        def timed_draw(state):
+            with frame_pipeline.timed("frame"):
+                return draw(state)
+        timed_draw.close = getattr(draw, "close", lambda: None)
+        return timed_draw
+
+def run_one(name, frames, workers):
+    module_name, bench = BENCHMARKS[name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+
+    times = frame_pipeline.stage_times = {}
+    spec = bench(module, frames)
+    times["simulate"] = time.perf_counter() - imported
+
+    rendered = 0
+    if spec is not None:
+        setup, states, args, ext, fps = spec
+        states = list(states)
+        with tempfile.TemporaryDirectory() as tmp:
+            sink = stream_encoder.open_encoder(os.path.join(tmp, name + ext), fps)
+            parallel_render.render(_TimedSetup(setup), states, sink, workers=workers, args=args)
+            sink.release()
+        rendered = len(states)
+    total = time.perf_counter() - imported
+
+    # Artist updates are whatever draw() spent outside the rasterizer
+    times["draw"] = max(0.0, times.pop("frame", 0.0) - times.get("rasterize", 0.0))
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "frames": rendered,
+        "import_seconds": round(imported - start, 4),
+        "seconds": round(total, 4),
+        "fps": round(rendered / total, 2) if rendered else None,
+        "stages": {stage: round(times.get(stage, 0.0), 4) for stage in STAGES},
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+    }
+
+def _run_child(name, frames, workers, conn):
+    try:
+        conn.send((run_one(name, frames, workers), None))
+    except Exception as e:
+        conn.send((None, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+def run(names, frames, workers):
+    # A fresh interpreter per benchmark keeps peak RSS and import costs separate. It is a
+    # plain Process, not a Pool worker: pool workers are daemonic and --workers needs children.
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        receiver, sender = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_run_child, args=(name, frames, workers, sender))
+        proc.start()
+        sender.close()
+        try:
+            result, error = receiver.recv()
+        except EOFError:
+            result, error = None, "worker exited without a result"
+        proc.join()
+        if error:
+            raise RuntimeError(f"Benchmark {name} failed: {error}")
+        results[name] = result
+        print_result(name, results[name])
+    return results
+
+def print_result(name, result):
+    stages = " ".join(f"{stage}={result['stages'][stage]:.3f}s" for stage in STAGES)
+    fps = f"{result['fps']:.1f} fps" if result["fps"] else "-"
+    print(f"{name:<15} {result['seconds']:8.3f}s {fps:>11}  {result['peak_rss_mb']:7.1f} MB  "
+          f"import={result['import_seconds']:.3f}s {stages}")
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(f"{name}: {base['seconds']:.3f}s -> {result['seconds']:.3f}s")
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {base['peak_rss_mb']} MB -> {result['peak_rss_mb']} MB")
+    return regressions
+
+
+# ===== MAIN =====
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless rendering/simulation benchmarks")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--frames", type=int, default=60, help="Frames rendered per benchmark")
+    parser.add_argument("--workers", type=int, default=1, help="Render processes (stage times cover the main process only)")
+    parser.add_argument("--save", help="Write results to this JSON baseline")
+    parser.add_argument("--compare", help="Compare against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown/RSS growth before flagging")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(unknown)}")
+    results = run(names, args.frames, args.workers)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"frames": args.frames, "workers": args.workers, "python": platform.python_version(),
+                       "machine": platform.machine(), "cpus": os.cpu_count(), "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
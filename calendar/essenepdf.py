@@ -165,11 +165,13 @@ def generate_essene_calendar(start_date, end_date, location):
     
     return days
 
-if __name__ == "__main__":
-    location = LocationInfo("Jerusalem", "Israel", "Asia/Jerusalem", 31.7683, 35.2137)
-    start_date = datetime(2025, 3, 20)
-    end_date = datetime(2026, 3, 19)
+def main(location=None, start_date=datetime(2025, 3, 20), end_date=datetime(2026, 3, 19),
+         filename="Essene_Calendar_Year7.pdf"):
+    location = location or LocationInfo("Jerusalem", "Israel", "Asia/Jerusalem", 31.7683, 35.2137)
     calendar_data = generate_essene_calendar(start_date, end_date, location)
-    generate_pdf(calendar_data, "Essene_Calendar_Year7.pdf")
+    generate_pdf(calendar_data, filename)
+
+if __name__ == "__main__":
+    main()
 
 
@@ -0,0 +1,107 @@
+import os
+import sys
+import argparse
+import importlib
+import importlib.util
+
+"""
+# Tariff summary only: numpy, no plotting libraries, no window
+python3 -m demos tariff --no-show
+
+# Tariff summary plus the quarterly animation
+python3 -m demos tariff --out tariff_impact.mp4 --no-show
+
+# Render a GIF headless with a custom frame count and 4 render processes
+python3 -m demos fft --frames 50 --out fft.gif --no-show --workers 4
+"""
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ===== COMMANDS =====
+# Each script is imported only when its command runs, so heavy libraries
+# (cv2, matplotlib, seaborn, plotly, reportlab) are never loaded for the others
+
+def run_tariff(args):
+    import tariff_engine
+    dynamic = importlib.import_module("GDPChessOver4YearsDynamicCharting")
+    results = dynamic.simulate_tariff_impact(0.20, tariff_engine.SECTOR_PERCENTAGES, tariff_engine.ELASTICITIES,
+                                             inflation_rate=0.02, retaliation_factor=0.05)
+
+    print("GDP Impact of Tariffs (% Change in GDP):")
+    for country, impacts in results.items():
+        print(f"{country}: {impacts[-1]:.2f}% after {len(impacts)} quarters")
+
+    if args.out:
+        dynamic.create_animation(results, args.out, frames=args.frames, workers=args.workers)
+        print(f"Animation saved as '{args.out}'")
+    if args.show:
+        static = importlib.import_module("GDPChessOver4YearsStatic")
+        static.plot_results(static.simulate_tariff_impact(0.20, tariff_engine.SECTOR_PERCENTAGES, tariff_engine.ELASTICITIES))
+
+def run_fft(args):
+    module = importlib.import_module("fft_algo_demo")
+    module.main(out=args.out or "fft_visualization.gif", frames=args.frames or module.num_frames,
+                show=args.show, workers=args.workers)
+
+def run_clt(args):
+    module = importlib.import_module("normal_distribution_demo")
+    module.main(out=args.out or "clt_animation.gif", frames=args.frames or module.num_samples,
+                show=args.show, workers=args.workers)
+
+def run_pi(args):
+    module = importlib.import_module("pi_day_archimedes")
+    max_sides = args.frames + 2 if args.frames else 96  # Frames start at a triangle
+    module.animate_archimedes(max_sides=max_sides, workers=args.workers, filename=args.out or "archimedes_pi.gif")
+
+def run_coffee(args):
+    module = importlib.import_module("regression_fic_coffee")
+    module.animate_regression(workers=args.workers, filename=args.out or "coffee_regression.gif",
+                              num_points=args.frames or 50)
+
+def run_sankey(args):
+    module = importlib.import_module("trade_def_during_joe")
+    module.main(out=args.out, show=args.show)
+
+def run_calendar(args):
+    # calendar/ is not a package (and must not shadow the stdlib calendar module), so load by path
+    spec = importlib.util.spec_from_file_location("essenepdf", os.path.join(HERE, "calendar", "essenepdf.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if args.out:
+        module.main(filename=args.out)
+    else:
+        module.main()
+
+COMMANDS = {
+    "tariff": run_tariff,
+    "fft": run_fft,
+    "clt": run_clt,
+    "pi": run_pi,
+    "coffee": run_coffee,
+    "sankey": run_sankey,
+    "calendar": run_calendar,
+}
+
+
+# ===== MAIN =====
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch entry point for the demo and simulation scripts")
+    parser.add_argument("command", choices=list(COMMANDS))
+    parser.add_argument("--out", help="Output file (each command has its own default)")
+    parser.add_argument("--frames", type=int, help="Number of frames/samples to render")
+    parser.add_argument("--no-show", dest="show", action="store_false", help="Never open a window; render with Agg only")
+    parser.add_argument("--workers", type=int, default=1, help="Render processes for animations")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.show:
+        # Set before any script imports matplotlib so no GUI backend is ever loaded
+        os.environ["MPLBACKEND"] = "Agg"
+    sys.path.insert(0, HERE)
+    COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    main()
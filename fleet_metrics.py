@@ -0,0 +1,447 @@
+import json
+import math
+import time
+import queue
+import socket
+import asyncio
+import argparse
+import threading
+import urllib.parse
+import urllib.request
+import numpy as np
+from host_metrics import RollingStats, merge, named_stats
+
+"""
+# Collector: agents connect over TCP or UDP on 9100, queries go to HTTP on 9101
+python3 fleet_metrics.py collect --port 9100 --http-port 9101
+
+# Query it (or curl the same URLs)
+python3 fleet_metrics.py query localhost:9101 /hosts
+python3 fleet_metrics.py query localhost:9101 "/fleet?window=300"
+python3 fleet_metrics.py query localhost:9101 "/host/web1?window=60"
+
+# Load-test a collector on localhost: 300 synthetic agents, 10 samples/s each, for 30 s
+python3 fleet_metrics.py simulate localhost:9100 --agents 300 --interval 0.1 --seconds 30
+
+# On each server, stream samples to the collector as well as the local log
+python3 server_cpu_utl_sampling.py --collector metrics-host:9100
+"""
+
+# Columns and windows the collector aggregates; agents may send more columns
+FLEET_COLUMNS = ("cpu", "mem_percent", "disk_read_Bps", "disk_write_Bps", "net_sent_Bps", "net_recv_Bps")
+FLEET_WINDOWS = (60, 300)
+MAX_HOSTS = 1000
+HOST_EXPIRE = 600  # Seconds without data before a host's aggregates are dropped
+LINE_LIMIT = 1024 * 1024  # Longest batch line buffered per TCP connection
+UDP_QUEUE = 1024  # Datagrams waiting to be applied
+AGENT_BATCH = 10  # Samples per message
+AGENT_PENDING = 360  # Batches an agent holds while the collector is slow or away
+# Largest message an agent sends: one UDP datagram (at most 65,507 bytes), well under LINE_LIMIT over TCP
+UDP_MESSAGE_BYTES = 60000
+TCP_MESSAGE_BYTES = LINE_LIMIT // 4
+VALUE_BYTES = 26  # Longest JSON float plus separator, for sizing batches
+# Limits on what an agent may announce, so one hello cannot make the collector allocate without bound
+MIN_INTERVAL = 0.01  # Seconds
+MAX_WINDOW_ROWS = 30000  # Longest window / interval
+MAX_NAMES = 1024
+MAX_NAME_LENGTH = 128
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or "localhost", int(port)
+
+
+class FleetAgent:
+    """
+    Sends a sampler's rows to a collector in batches from a background thread, with
+    the same append/close interface as TimeSeriesWriter. Over TCP the first line is
+    a hello with host, column names and interval, then one JSON line per batch.
+    Over UDP every batch is one self-describing datagram.
+
+    Batches wait in a bounded queue. A slow TCP collector stops reading, sendall
+    blocks and the queue fills; only then is the oldest batch discarded. Discarded
+    rows are counted and the count rides along with the next batch, so the collector
+    reports them. A lost connection is retried with backoff, resending the batch.
+
+    batch is capped so a message of full-length numbers stays within
+    UDP_MESSAGE_BYTES or TCP_MESSAGE_BYTES; a message that still comes out larger
+    is split in half until it fits, and a single row that cannot fit is dropped.
+    """
+
+    def __init__(self, address, host, names, interval=1.0, batch=AGENT_BATCH, transport="tcp",
+                 max_pending=AGENT_PENDING):
+        self.address = address
+        self.hello = {"host": host, "names": list(names), "interval": interval}
+        self.transport = transport
+        self.max_bytes = UDP_MESSAGE_BYTES if transport == "udp" else TCP_MESSAGE_BYTES
+        header = 64 + (len(json.dumps(self.hello)) if transport == "udp" else 0)
+        self.batch = max(1, min(batch, (self.max_bytes - header) // ((len(self.hello["names"]) + 1) * VALUE_BYTES)))
+        self.times, self.rows = [], []
+        self.pending = queue.Queue(max_pending)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def append(self, t, row):
+        self.times.append(float(t))
+        self.rows.append([float(x) for x in row])
+        if len(self.times) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.times:
+            return
+        batch = {"t": self.times, "v": self.rows}
+        self.times, self.rows = [], []
+        while True:
+            try:
+                self.pending.put_nowait(batch)
+                return
+            except queue.Full:
+                try:
+                    oldest = self.pending.get_nowait()
+                except queue.Empty:
+                    continue
+                with self.lock:
+                    self.dropped += len(oldest["t"])
+
+    def _connect(self):
+        if self.transport == "udp":
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.connect(self.address)
+            return sock
+        sock = socket.create_connection(self.address, timeout=10)
+        sock.settimeout(None)
+        sock.sendall(json.dumps(self.hello).encode() + b"\n")
+        return sock
+
+    def _run(self):
+        sock, ready, backoff = None, [], 1.0  # ready: batches to send next, in order
+        while True:
+            if not ready:
+                try:
+                    ready.append(self.pending.get(timeout=0.5))
+                except queue.Empty:
+                    if self.closed.is_set():
+                        break
+                    continue
+            batch = ready[0]
+            with self.lock:
+                dropped, self.dropped = self.dropped, 0
+            message = dict(batch, dropped=dropped)
+            if self.transport == "udp":
+                message.update(self.hello)
+            data = json.dumps(message).encode() + b"\n"
+            if len(data) > self.max_bytes:
+                # Resending it unchanged would fail forever; halve it, or give up on a lone row
+                ready.pop(0)
+                half = len(batch["t"]) // 2
+                if half:
+                    ready[:0] = [{"t": batch["t"][:half], "v": batch["v"][:half]},
+                                 {"t": batch["t"][half:], "v": batch["v"][half:]}]
+                else:
+                    print(f"Collector {self.address[0]}:{self.address[1]}: dropping a {len(data)}-byte sample")
+                    dropped += 1
+                with self.lock:
+                    self.dropped += dropped
+                continue
+            try:
+                if sock is None:
+                    sock = self._connect()
+                sock.sendall(data)
+                ready.pop(0)
+                backoff = 1.0
+            except OSError as e:
+                with self.lock:
+                    self.dropped += dropped
+                if sock:
+                    sock.close()
+                    sock = None
+                print(f"Collector {self.address[0]}:{self.address[1]}: {e}; retrying in {backoff:.0f} s")
+                if self.closed.wait(backoff):
+                    break
+                backoff = min(backoff * 2, 30.0)
+        if sock:
+            sock.close()
+
+    def close(self, timeout=5.0):
+        """Sends what is queued, waiting at most timeout seconds for the collector."""
+        self.flush()
+        self.closed.set()
+        self.thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Host:
+    def __init__(self, hello, columns, windows):
+        self.names = hello["names"]
+        self.interval = float(hello["interval"])
+        self.idx = [self.names.index(c) for c in columns]  # ValueError if the agent lacks a column
+        self.stats = RollingStats(columns, self.interval, windows)
+        self.samples = 0
+        self.dropped = 0  # Rows the agent reports discarding
+        self.last_time = None
+        self.last_seen = time.monotonic()
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, collector):
+        self.collector = collector
+
+    def datagram_received(self, data, addr):
+        try:
+            self.collector.datagrams.put_nowait(data)
+        except asyncio.QueueFull:
+            self.collector.udp_dropped += 1
+
+
+class FleetCollector:
+    """
+    Rolling aggregates per host and across the fleet from FleetAgent streams.
+
+    Each host gets RollingStats over the FLEET_COLUMNS it sends; fleet statistics
+    are merged from the per-host windows when queried, so ingest cost does not grow
+    with the number of hosts. Memory is bounded: at most max_hosts hosts (further
+    agents are refused with an error line), hosts silent for expire seconds are
+    forgotten, each TCP connection buffers at most LINE_LIMIT bytes and UDP at most
+    UDP_QUEUE datagrams. A TCP agent that outpaces the collector is slowed by TCP
+    flow control once its buffer is full; UDP has none, so datagrams beyond the
+    queue are counted in udp_dropped.
+    """
+
+    def __init__(self, columns=FLEET_COLUMNS, windows=FLEET_WINDOWS, max_hosts=MAX_HOSTS, expire=HOST_EXPIRE):
+        self.columns = list(columns)
+        self.windows = tuple(windows)
+        self.max_hosts = max_hosts
+        self.expire = expire
+        self.hosts = {}
+        self.datagrams = asyncio.Queue(UDP_QUEUE)
+        self.udp_dropped = 0
+
+    def _check_hello(self, hello):
+        name, names, interval = hello["host"], hello["names"], hello["interval"]
+        if not isinstance(name, str) or not 0 < len(name) <= MAX_NAME_LENGTH:
+            raise ValueError("host must be a non-empty string")
+        if (not isinstance(names, list) or len(names) > MAX_NAMES
+                or not all(isinstance(n, str) and len(n) <= MAX_NAME_LENGTH for n in names)):
+            raise ValueError(f"names must be a list of at most {MAX_NAMES} strings")
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or not math.isfinite(interval):
+            raise ValueError("interval must be a number")
+        if interval < MIN_INTERVAL or max(self.windows) / interval > MAX_WINDOW_ROWS:
+            raise ValueError(f"interval must be at least {max(MIN_INTERVAL, max(self.windows) / MAX_WINDOW_ROWS)} s")
+
+    def _host(self, hello):
+        self._check_hello(hello)
+        name = hello["host"]
+        host = self.hosts.get(name)
+        if host is None or host.names != hello["names"] or host.interval != float(hello["interval"]):
+            if host is None and len(self.hosts) >= self.max_hosts:
+                raise ValueError(f"collector is full ({self.max_hosts} hosts)")
+            host = self.hosts[name] = _Host(hello, self.columns, self.windows)
+        return host
+
+    def ingest(self, hello, message):
+        """Applies one batch to the host named in hello, looked up afresh so an expired host comes back."""
+        host = self._host(hello)
+        values = np.asarray(message["v"], dtype=float)
+        times = np.asarray(message["t"], dtype=float)
+        if values.ndim != 2 or values.shape[1] != len(host.names) or times.shape != (len(values),):
+            raise ValueError(f"batch shape {values.shape} does not match {len(host.names)} columns")
+        if not (np.isfinite(values).all() and np.isfinite(times).all()):
+            raise ValueError("batch holds non-finite values")
+        dropped = max(0, int(message.get("dropped", 0)))
+        for t, row in zip(times.tolist(), values[:, host.idx]):
+            host.stats.push(t, row)
+        host.samples += len(values)
+        host.dropped += dropped
+        host.last_time = times[-1].item() if len(values) else host.last_time
+        host.last_seen = time.monotonic()
+
+    async def _handle_agent(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            hello = json.loads(line)
+            self._host(hello)  # Refuse a bad hello before any batch arrives
+            while line := await reader.readline():
+                self.ingest(hello, json.loads(line))
+                await asyncio.sleep(0)  # Buffered lines would otherwise starve other agents
+        except ConnectionError:
+            pass
+        except Exception as e:  # Whatever an agent sends, only its own connection ends
+            print(f"Agent {peer}: {e!r}")
+            writer.write(json.dumps({"error": str(e)}).encode() + b"\n")
+        finally:
+            writer.close()
+
+    async def _apply_datagrams(self):
+        while True:
+            data = await self.datagrams.get()
+            try:
+                message = json.loads(data)
+                self.ingest(message, message)
+            except Exception as e:  # One bad packet must not stop the loop
+                print(f"Datagram: {e!r}")
+
+    async def _expire_hosts(self):
+        while True:
+            await asyncio.sleep(min(60, self.expire))
+            cutoff = time.monotonic() - self.expire
+            for name in [name for name, host in self.hosts.items() if host.last_seen < cutoff]:
+                del self.hosts[name]
+
+    def query(self, target):
+        """(HTTP status, JSON-able body) for /hosts, /host/<name> or /fleet, each with optional ?window=."""
+        url = urllib.parse.urlsplit(target)
+        params = urllib.parse.parse_qs(url.query)
+        window = int(params.get("window", [self.windows[0]])[0])
+        if window not in self.windows:
+            return 400, {"error": f"window must be one of {list(self.windows)}"}
+        now = time.monotonic()
+        if url.path == "/hosts":
+            return 200, {name: {"samples": host.samples, "dropped": host.dropped, "last_time": host.last_time,
+                                "idle_seconds": round(now - host.last_seen, 1)}
+                         for name, host in self.hosts.items()}
+        if url.path.startswith("/host/"):
+            host = self.hosts.get(urllib.parse.unquote(url.path[len("/host/"):]))
+            if host is None:
+                return 404, {"error": "unknown host"}
+            return 200, {"window": window, "samples": host.samples, "dropped": host.dropped,
+                         "stats": _clean(host.stats.stats(window))}
+        if url.path == "/fleet":
+            hosts = list(self.hosts.items())
+            stats = named_stats(self.columns, merge(h.stats.windows[window] for _, h in hosts)) if hosts else {}
+            busiest = sorted(((float(h.stats.windows[window].mean[0]), name) for name, h in hosts), reverse=True)[:10]
+            return 200, {"window": window, "hosts": len(hosts), "dropped": sum(h.dropped for _, h in hosts),
+                         "udp_dropped": self.udp_dropped, "stats": _clean(stats),
+                         "busiest": [{"host": name, self.columns[0]: mean} for mean, name in busiest]}
+        return 404, {"error": "use /hosts, /host/<name> or /fleet"}
+
+    async def _handle_http(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while await reader.readline() not in (b"\r\n", b"\n", b""):
+                pass
+            method, target, _ = request.decode("latin-1").split(" ", 2)
+            status, body = self.query(target) if method == "GET" else (405, {"error": "GET only"})
+        except ValueError as e:
+            status, body = 400, {"error": str(e)}
+        data = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def serve(self, host="0.0.0.0", port=9100, http_port=9101):
+        loop = asyncio.get_running_loop()
+        agents = await asyncio.start_server(self._handle_agent, host, port, limit=LINE_LIMIT)
+        udp, _ = await loop.create_datagram_endpoint(lambda: _Datagrams(self), local_addr=(host, port))
+        http = await asyncio.start_server(self._handle_http, host, http_port)
+        print(f"Collecting on {host}:{port} (tcp, udp), queries on {host}:{http_port}")
+        try:
+            await asyncio.gather(agents.serve_forever(), http.serve_forever(),
+                                 self._apply_datagrams(), self._expire_hosts())
+        finally:
+            udp.close()
+
+
+def _clean(stats):
+    # JSON has no NaN; empty windows come back as null
+    return {name: {key: (None if np.isnan(value) else value) for key, value in column.items()}
+            for name, column in stats.items()}
+
+
+async def _fake_agent(address, name, interval, batch, seconds, transport, counts):
+    # Same wire format as FleetAgent, from asyncio so hundreds fit in one process
+    rng = np.random.default_rng(abs(hash(name)))
+    names = list(FLEET_COLUMNS) + ["cpu0", "cpu1"]
+    hello = {"host": name, "names": names, "interval": interval}
+    level = rng.uniform(5, 90)
+    if transport == "udp":
+        udp, _ = await asyncio.get_running_loop().create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                                           remote_addr=address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+        writer.write(json.dumps(hello).encode() + b"\n")
+    start = time.time()
+    for i in range(0, int(seconds / interval), batch):
+        times = [start + (i + k) * interval for k in range(batch)]
+        values = np.clip(rng.normal(level, 5, (batch, len(names))), 0, 100).round(2).tolist()
+        message = {"t": times, "v": values, "dropped": 0}
+        if transport == "udp":
+            udp.sendto(json.dumps(dict(message, **hello)).encode())
+        else:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()  # Waits here whenever the collector falls behind
+        counts["samples"] += batch
+        await asyncio.sleep(max(0.0, times[-1] + interval - time.time()))
+    if transport == "udp":
+        udp.close()
+    else:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def simulate(address, agents, interval, batch, seconds, transport):
+    counts = {"samples": 0}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_fake_agent(address, f"sim{i:04d}", interval, batch, seconds, transport, counts)
+                           for i in range(agents)))
+    elapsed = time.perf_counter() - t0
+    print(f"{agents} agents sent {counts['samples']} samples in {elapsed:.1f} s "
+          f"({counts['samples'] / elapsed:.0f}/s, {transport})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet-wide CPU sampler aggregation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_collect = sub.add_parser("collect", help="Run the collector")
+    p_collect.add_argument("--bind", default="0.0.0.0")
+    p_collect.add_argument("--port", type=int, default=9100, help="TCP and UDP port for agents")
+    p_collect.add_argument("--http-port", type=int, default=9101, help="Query port")
+    p_collect.add_argument("--max-hosts", type=int, default=MAX_HOSTS)
+    p_query = sub.add_parser("query", help="Fetch a query endpoint")
+    p_query.add_argument("address", help="host:port of the query endpoint")
+    p_query.add_argument("path", nargs="?", default="/fleet")
+    p_sim = sub.add_parser("simulate", help="Run synthetic agents against a collector")
+    p_sim.add_argument("address", help="host:port of the collector")
+    p_sim.add_argument("--agents", type=int, default=100)
+    p_sim.add_argument("--interval", type=float, default=1.0)
+    p_sim.add_argument("--batch", type=int, default=AGENT_BATCH)
+    p_sim.add_argument("--seconds", type=float, default=30.0)
+    p_sim.add_argument("--udp", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "collect":
+            asyncio.run(FleetCollector(max_hosts=args.max_hosts).serve(args.bind, args.port, args.http_port))
+        elif args.command == "query":
+            host, port = parse_address(args.address)
+            try:
+                with urllib.request.urlopen(f"http://{host}:{port}{args.path}") as response:
+                    body = json.load(response)
+            except urllib.error.HTTPError as e:
+                body = json.load(e)
+            print(json.dumps(body, indent=2))
+        else:
+            asyncio.run(simulate(parse_address(args.address), args.agents, args.interval, args.batch, args.seconds,
+                                 "udp" if args.udp else "tcp"))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
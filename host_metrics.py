@@ -0,0 +1,243 @@
+import time
+import numpy as np
+import psutil
+
+# Windows the collector keeps statistics for, in seconds
+WINDOWS = (60, 300, 3600)
+
+# Quantile sketch: log-spaced buckets with ~1% relative error between SKETCH_MIN and SKETCH_MAX
+SKETCH_GAMMA = 1.02
+SKETCH_MIN = 1e-2
+SKETCH_MAX = 1e13
+
+
+class RingBuffer:
+    """Fixed-size (capacity, width) sample buffer with timestamps; old rows are overwritten."""
+
+    def __init__(self, capacity, width, dtype=np.float32):
+        self.times = np.zeros(capacity)
+        self.values = np.zeros((capacity, width), dtype=dtype)
+        self.capacity = capacity
+        self.count = 0  # Rows ever pushed
+
+    def push(self, t, row):
+        i = self.count % self.capacity
+        self.times[i] = t
+        self.values[i] = row
+        self.count += 1
+        return self.values[i]
+
+    def ago(self, n):
+        """Row pushed n samples before the newest (n=0 is the newest)."""
+        return self.values[(self.count - 1 - n) % self.capacity]
+
+    def last(self, n=None):
+        """(times, values) of the newest n rows in chronological order, as copies."""
+        n = min(self.count, self.capacity) if n is None else min(n, self.count, self.capacity)
+        idx = np.arange(self.count - n, self.count) % self.capacity
+        return self.times[idx], self.values[idx]
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram per column (DDSketch-style): each value lands in the
+    bucket ceil(log_gamma(x)), so any quantile comes back within ~1% of the true
+    value. Unlike most sketches it supports removal, which is what lets a window
+    slide. Values at or below SKETCH_MIN share a zero bucket.
+    """
+
+    def __init__(self, width):
+        self.log_gamma = np.log(SKETCH_GAMMA)
+        self.offset = int(np.ceil(np.log(SKETCH_MIN) / self.log_gamma))
+        n_buckets = int(np.ceil(np.log(SKETCH_MAX) / self.log_gamma)) - self.offset + 2
+        self.counts = np.zeros((width, n_buckets), dtype=np.int32)
+        self.rows = np.arange(width)
+
+    def index(self, row):
+        """Bucket of every value in row; the same for all sketches, so it can be computed once and reused."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            idx = np.ceil(np.log(np.maximum(row, SKETCH_MIN)) / self.log_gamma)
+        idx -= self.offset - 1
+        idx[row <= SKETCH_MIN] = 0
+        np.minimum(idx, self.counts.shape[1] - 1, out=idx)
+        return idx.astype(np.intp)
+
+    def add(self, row, buckets=None):
+        self.counts[self.rows, self.index(row) if buckets is None else buckets] += 1
+
+    def remove(self, row, buckets=None):
+        self.counts[self.rows, self.index(row) if buckets is None else buckets] -= 1
+
+    def quantiles(self, qs):
+        """Array (len(qs), width) of estimated quantiles; NaN for empty columns."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1]
+        out = np.full((len(qs), len(self.rows)), np.nan)
+        for i, q in enumerate(qs):
+            rank = np.ceil(q * total).clip(min=1)
+            bucket = (cumulative < rank[:, None]).sum(axis=1)
+            value = 2 * SKETCH_GAMMA ** (bucket + self.offset - 1) / (SKETCH_GAMMA + 1)
+            out[i] = np.where(bucket == 0, 0.0, value)
+        out[:, total == 0] = np.nan
+        return out
+
+
+class WindowStats:
+    """Streaming mean/variance (Welford, with removal) and quantile sketch over the last `size` samples."""
+
+    def __init__(self, size, width):
+        self.size = size
+        self.n = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.sketch = QuantileSketch(width)
+
+    def add(self, row, buckets=None):
+        self.n += 1
+        delta = row - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (row - self.mean)
+        self.sketch.add(row, buckets)
+
+    def remove(self, row, buckets=None):
+        if self.n <= 1:
+            self.n = 0
+            self.mean[:] = 0.0
+            self.m2[:] = 0.0
+        else:
+            delta = row - self.mean
+            self.n -= 1
+            self.mean -= delta / self.n
+            self.m2 -= delta * (row - self.mean)
+            np.maximum(self.m2, 0.0, out=self.m2)  # Guard against rounding below zero
+        self.sketch.remove(row, buckets)
+
+    def summary(self):
+        std = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.zeros_like(self.mean)
+        p50, p95, p99 = self.sketch.quantiles((0.50, 0.95, 0.99))
+        return {"n": self.n, "mean": self.mean.copy(), "std": std, "p50": p50, "p95": p95, "p99": p99}
+
+
+def merge(stats):
+    """
+    One WindowStats covering several, e.g. the same window on many hosts: means and
+    variances combine with the parallel form of Welford's update and the sketches
+    add bucket by bucket, so fleet quantiles keep the same ~1% error.
+    """
+    stats = list(stats)
+    out = WindowStats(sum(s.size for s in stats), len(stats[0].mean))
+    for s in stats:
+        if not s.n:
+            continue
+        n = out.n + s.n
+        delta = s.mean - out.mean
+        out.mean += delta * s.n / n
+        out.m2 += s.m2 + delta ** 2 * out.n * s.n / n
+        out.n = n
+        out.sketch.counts += s.sketch.counts
+    return out
+
+
+def named_stats(names, window_stats):
+    """{column: {"mean", "std", "p50", "p95", "p99"}} from a WindowStats."""
+    summary = window_stats.summary()
+    return {name: {key: float(summary[key][i]) for key in ("mean", "std", "p50", "p95", "p99")}
+            for i, name in enumerate(names)}
+
+
+class RollingStats:
+    """
+    Rows of named columns pushed into a ring buffer sized for the longest window,
+    with streaming statistics for every window at once. A sample that ages out of a
+    window is removed from that window's stats using the copy still in the ring, so
+    memory is fixed by the window lengths and the sampling interval, however long
+    it runs.
+    """
+
+    def __init__(self, names, interval=1.0, windows=WINDOWS):
+        self.interval = interval
+        self.names = list(names)
+        self.column = {name: i for i, name in enumerate(self.names)}
+        self.windows = {seconds: WindowStats(max(1, round(seconds / interval)), len(self.names)) for seconds in windows}
+        # One spare row so the sample leaving the longest window is still there to remove
+        self.ring = RingBuffer(max(w.size for w in self.windows.values()) + 1, len(self.names))
+        # Sketch bucket of every value in the ring, so adds and removals skip the log
+        self.buckets = np.zeros((self.ring.capacity, len(self.names)), dtype=np.int16)
+        self._index = next(iter(self.windows.values())).sketch.index
+
+    def push(self, t, row):
+        slot = self.ring.count % self.ring.capacity
+        row = self.ring.push(t, row).astype(float)  # Exactly what the ring will hand back on removal
+        buckets = self.buckets[slot] = self._index(row)
+        for stats in self.windows.values():
+            stats.add(row, buckets)
+            if stats.n > stats.size:
+                old = (self.ring.count - 1 - stats.size) % self.ring.capacity
+                stats.remove(self.ring.values[old].astype(float), self.buckets[old])
+
+    def stats(self, window):
+        """{column: {"mean", "std", "p50", "p95", "p99"}} over the given window (seconds)."""
+        return named_stats(self.names, self.windows[window])
+
+
+class Collector(RollingStats):
+    """
+    Samples per-core CPU, memory, disk I/O and network counters from psutil into
+    RollingStats. Counters (disk, network) are stored as per-second rates since the
+    previous read.
+
+    Per-core CPU comes from one /proc/stat read and is taken every sample. Memory,
+    swap, disk and network cost several /proc files each, so at sub-second intervals
+    they are re-read only every slow_interval seconds and repeated in between.
+    """
+
+    def __init__(self, interval=1.0, windows=WINDOWS, slow_interval=1.0):
+        self.cores = psutil.cpu_count() or 1
+        names = (["cpu"] + [f"cpu{i}" for i in range(self.cores)] +
+                 ["mem_percent", "mem_used", "swap_percent",
+                  "disk_read_Bps", "disk_write_Bps", "disk_read_iops", "disk_write_iops",
+                  "net_sent_Bps", "net_recv_Bps", "net_packets_sent", "net_packets_recv"])
+        super().__init__(names, interval, windows)
+        self._counters = None
+        self._slow_every = max(1, round(slow_interval / interval))
+        self._slow = None
+        self._reads = 0
+        psutil.cpu_percent(percpu=True)  # Prime the non-blocking per-core deltas
+
+    def _read_counters(self):
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        disk = (disk.read_bytes, disk.write_bytes, disk.read_count, disk.write_count) if disk else (0, 0, 0, 0)
+        net = (net.bytes_sent, net.bytes_recv, net.packets_sent, net.packets_recv) if net else (0, 0, 0, 0)
+        return time.monotonic(), np.array(disk + net, dtype=float)
+
+    def _read_slow(self):
+        mem = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        now, counters = self._read_counters()
+        if self._counters is None:
+            rates = np.zeros_like(counters)
+        else:
+            then, previous = self._counters
+            rates = np.maximum(counters - previous, 0) / max(now - then, 1e-9)
+        self._counters = (now, counters)
+        return np.concatenate(([mem.percent, mem.used, swap.percent], rates))
+
+    def read(self):
+        """One sample row as a float array in self.names order."""
+        cores = psutil.cpu_percent(percpu=True)
+        if self._reads % self._slow_every == 0:
+            self._slow = self._read_slow()
+        self._reads += 1
+        return np.concatenate(([np.mean(cores)], cores, self._slow))
+
+    def sample(self, t=None):
+        row = self.read()
+        self.push(time.time() if t is None else t, row)
+        return row
+
+    def hot_cores(self, window, top=3):
+        """[(core name, p95 %)] of the busiest cores over the window, hottest first."""
+        p95 = self.windows[window].summary()["p95"][1:1 + self.cores]
+        order = np.argsort(np.nan_to_num(p95, nan=-1.0))[::-1][:top]
+        return [(f"cpu{i}", float(p95[i])) for i in order]
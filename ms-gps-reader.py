@@ -1,55 +1,193 @@
+import time
+import queue
+import curses
+import argparse
+import threading
 import serial
 import pynmea2
-import curses
 
-def gps_display(stdscr):
-    # Initialize the serial port
-    ser = serial.Serial('/dev/ttyUSB0', baudrate=4800, timeout=1)
+"""
+# Live display from a USB GPS at 4800 baud, 4 redraws a second
+python3 ms-gps-reader.py
 
-    # Configure the curses screen
-    stdscr.clear()
-    stdscr.nodelay(1)  # Make getch() non-blocking
-    stdscr.timeout(2500)  # Refresh every 2500ms
+# Faster receiver on another port
+python3 ms-gps-reader.py --port /dev/ttyACM0 --baudrate 115200 --fps 10
+
+# Any pyserial URL works, e.g. an NMEA stream served over TCP
+python3 ms-gps-reader.py --port socket://192.168.1.20:10110
+"""
+
+PORT = '/dev/ttyUSB0'
+BAUDRATE = 4800
+FPS = 4  # Screen refreshes per second
+QUEUE_SIZE = 4096  # Parsed sentences waiting for the renderer, ~30 s at 115200 baud
+MAX_LINE = 1024  # NMEA sentences are at most 82 characters; longer runs without a newline are noise
+
+
+def read_sentences(ser, sentences, stop):
+    """
+    Reader thread: drains the serial port in whatever chunks have arrived, splits
+    lines, parses GPS sentences and queues (type, line, msg, received). type is None
+    for an error, with its message as msg; a serial error also ends the thread. When
+    the queue is full the thread waits instead of dropping, leaving bytes in the
+    serial buffer.
+    """
+    pending = b""
+    while not stop.is_set():
+        try:
+            data = ser.read(ser.in_waiting or 1)  # Waits up to ser.timeout for the first byte
+        except serial.SerialException as e:
+            sentences.put((None, None, f"Serial error: {e}", time.monotonic()))
+            return
+        if not data:
+            continue
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > MAX_LINE:
+            pending = b""
+        received = time.monotonic()
+        for raw in lines:
+            line = raw.decode('ascii', errors='ignore').strip()
+            if not line.startswith('$GP'):  # Process only GPS sentences
+                continue
+            try:
+                msg = pynmea2.parse(line)
+                item = (msg.sentence_type, line, msg, received)
+            except pynmea2.ParseError as e:
+                item = (None, line, f"Parse error: {e}", received)
+            while not stop.is_set():
+                try:
+                    sentences.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
+
+
+class GpsState:
+    """Latest sentence of each type with a count, which types changed since the last frame, and errors."""
+
+    def __init__(self):
+        self.latest = {}  # type -> (line, msg)
+        self.counts = {}
+        self.changed = set()
+        self.total = 0
+        self.errors = 0
+        self.last_error = None
+
+    def drain(self, sentences):
+        """Applies everything queued; returns the oldest receive time among them, or None."""
+        oldest = None
+        while True:
+            try:
+                kind, line, msg, received = sentences.get_nowait()
+            except queue.Empty:
+                return oldest
+            oldest = received if oldest is None else oldest
+            self.total += 1
+            if kind is None:
+                self.errors += 1
+                self.last_error = msg
+                continue
+            self.latest[kind] = (line, msg)
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            self.changed.add(kind)
+
+
+class Screen:
+    """
+    Draws each sentence type in its own block, placed in order of first arrival.
+    Only blocks whose type changed are rewritten, line by line with clrtoeol, and
+    curses sends just the differing cells; nothing clears the whole screen.
+    """
 
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.blocks = {}  # type -> first row
+        self.next_row = 4
+
+    def put(self, row, text, attr=curses.A_NORMAL):
+        height, width = self.stdscr.getmaxyx()
+        if row >= height:
+            return
+        try:
+            self.stdscr.addnstr(row, 0, text, width - 1, attr)
+            self.stdscr.clrtoeol()
+        except curses.error:
+            pass
+
+    def draw_header(self):
+        self.put(0, "GPS Data (Updated Live)   q to quit", curses.A_BOLD)
+
+    def draw_status(self, state, sentences, lag):
+        self.put(1, f"{state.total} sentences, {state.errors} errors, "
+                    f"queue {sentences.qsize()}, display lag {lag * 1000:.0f} ms")
+        if state.last_error:
+            self.put(2, state.last_error[:200])
+
+    def draw_sentence(self, kind, line, msg, count):
+        row = self.blocks.get(kind)
+        if row is None:
+            row = self.blocks[kind] = self.next_row
+            self.next_row += len(msg.fields) + 3
+        self.put(row, f"{kind}  ({count} received)", curses.A_BOLD)
+        self.put(row + 1, f"Raw Sentence: {line}")
+        for i, field in enumerate(msg.fields):
+            label, attr = field[0], field[1]
+            self.put(row + 2 + i, f"{label}: {getattr(msg, attr, None)}")
+
+
+def gps_display(stdscr, ser, fps=FPS):
+    sentences = queue.Queue(QUEUE_SIZE)
+    stop = threading.Event()
+    reader = threading.Thread(target=read_sentences, args=(ser, sentences, stop), daemon=True)
+    reader.start()
+
+    curses.curs_set(0)
+    stdscr.clear()
+    screen = Screen(stdscr)
+    screen.draw_header()
+    state = GpsState()
+    frame = 1.0 / fps
+    next_frame = time.monotonic()
     try:
         while True:
-            # Read a line from the GPS device
-            line = ser.readline().decode('ascii', errors='ignore').strip()
-            if line.startswith('$GP'):  # Process only GPS sentences
-                try:
-                    msg = pynmea2.parse(line)
-                    
-                    # Clear screen before updating
-                    stdscr.clear()
-                    
-                    # Display information
-                    stdscr.addstr(0, 0, "GPS Data (Updated Live)", curses.A_BOLD)
-                    stdscr.addstr(2, 0, f"Raw Sentence: {line}")
-                    stdscr.addstr(3, 0, f"Parsed Data: {msg}")
-                    
-                    # Extract and display fields
-                    row = 5
-                    for field in msg.fields:
-                        label, attr = field[0], field[1]
-                        value = getattr(msg, attr, None)
-                        stdscr.addstr(row, 0, f"{label}: {value}")
-                        row += 1
-
-                    # Refresh screen
-                    stdscr.refresh()
-
-                    # Allow exiting with 'q'
-                    key = stdscr.getch()
-                    if key == ord('q'):
-                        break
-
-                except pynmea2.ParseError as e:
-                    stdscr.addstr(5, 0, f"Parse error: {e}")
+            oldest = state.drain(sentences)
+            for kind in state.changed:
+                line, msg = state.latest[kind]
+                screen.draw_sentence(kind, line, msg, state.counts[kind])
+            state.changed.clear()
+            screen.draw_status(state, sentences, 0.0 if oldest is None else time.monotonic() - oldest)
+            stdscr.noutrefresh()
+            curses.doupdate()
 
+            # Sleep until the next frame in getch, so 'q' still answers at once
+            next_frame += frame
+            wait = next_frame - time.monotonic()
+            if wait < 0:
+                next_frame, wait = time.monotonic(), 0
+            stdscr.timeout(int(wait * 1000))
+            if stdscr.getch() == ord('q'):
+                break
     except KeyboardInterrupt:
         pass
+    finally:
+        stop.set()
+        reader.join(1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live NMEA display for a serial GPS receiver")
+    parser.add_argument("--port", default=PORT, help="Serial device or pyserial URL")
+    parser.add_argument("--baudrate", type=int, default=BAUDRATE)
+    parser.add_argument("--fps", type=float, default=FPS, help="Screen refreshes per second")
+    args = parser.parse_args()
+
+    ser = serial.serial_for_url(args.port, baudrate=args.baudrate, timeout=0.1)
+    try:
+        curses.wrapper(gps_display, ser, args.fps)
     finally:
         ser.close()
 
-# Run the curses-based interface
-curses.wrapper(gps_display)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+import queue
+import traceback
+import multiprocessing
+from collections import Counter
+import numpy as np
+import frame_pipeline
+
+
+def _close(draw):
+    # A renderer that owns a figure hangs close() on its draw function
+    close = getattr(draw, "close", None)
+    if close is not None:
+        close()
+
+
+def _worker(setup, args, stage, buffer, slot_shape, tasks, results):
+    slots = np.frombuffer(buffer, dtype=np.uint8).reshape((-1,) + slot_shape)
+    try:
+        draw = setup(*args)
+    except Exception:
+        results.put((None, None, traceback.format_exc()))
+        return
+    try:
+        for state, slot in iter(tasks.get, None):
+            try:
+                frame = draw(state)
+                if stage is not None:
+                    frame = stage(frame)
+                if frame.shape != slot_shape:
+                    raise ValueError(f"Frame {state} has shape {frame.shape}, expected {slot_shape}")
+                slots[slot] = frame
+                results.put((state, slot, None))
+            except Exception:
+                results.put((state, None, traceback.format_exc()))
+    finally:
+        _close(draw)
+
+
+def render(setup, states, sink, workers=1, args=(), slots_per_worker=4, cache_bytes=256 * 1024 * 1024):
+    """
+    Renders a sequence of frames across worker processes and writes them to sink in order.
+
+    setup(*args) runs once per process and returns draw(state) -> BGR uint8 frame;
+    each worker owns its own figure. If draw has a close() attribute it is called
+    once the process is done drawing, so the figure does not outlive the render. states is the frame sequence: a state that
+    repeats (e.g. loops of the same quarters) is rendered once and replayed from a
+    FrameCache. Workers hand frames back through a shared-memory slot ring and the
+    writer releases a slot only after the frame is written, so at most
+    workers * slots_per_worker frames are in flight. sink is anything with
+    write(frame), such as stream_encoder.GifEncoder or Mp4Encoder.
+
+    A sink with worker_stage() (GifEncoder) gets the first frame through write(),
+    then its stage runs in the workers and the prepared frames go to
+    write_prepared(), so per-frame encoding work scales with the workers too.
+    """
+    states = list(states)
+    if not states:
+        return
+    remaining = Counter(states)
+
+    with frame_pipeline.FrameCache(max_bytes=cache_bytes) as cache:
+        write = sink.write
+
+        def emit(state, frame):
+            write(frame)
+            remaining[state] -= 1
+            if remaining[state] > 0:
+                cache.put(state, frame.copy())
+
+        # The first frame is drawn here to learn the frame size for the slot ring
+        draw = setup(*args)
+        workers = workers or os.cpu_count()
+        try:
+            first = draw(states[0])
+            if workers <= 1:
+                emit(states[0], first)
+                for state in states[1:]:
+                    frame = cache.get(state)
+                    emit(state, frame if frame is not None else draw(state))
+                return
+        finally:
+            _close(draw)
+
+        # The first frame goes out before the workers start: for a GIF it fixes the palette they index against.
+        # Slots and cache then hold frames in the form write() takes.
+        sink.write(first)
+        stage = getattr(sink, "worker_stage", lambda: None)()
+        if stage is not None:
+            write, first = sink.write_prepared, stage(first)
+        remaining[states[0]] -= 1
+        if remaining[states[0]] > 0:
+            cache.put(states[0], first.copy())
+
+        slot_shape = first.shape
+        n_slots = workers * slots_per_worker
+        ctx = multiprocessing.get_context()
+        buffer = ctx.RawArray("B", n_slots * first.nbytes)
+        slots = np.frombuffer(buffer, dtype=np.uint8).reshape((n_slots,) + slot_shape)
+        tasks, results = ctx.Queue(), ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(setup, args, stage, buffer, slot_shape, tasks, results), daemon=True)
+                 for _ in range(workers)]
+        for proc in procs:
+            proc.start()
+
+        # Unique states are issued in first-use order, one per free slot,
+        # so the next frame the writer needs is always already in flight
+        pending = iter([s for s in dict.fromkeys(states) if s != states[0]])
+        for slot in range(n_slots):
+            state = next(pending, None)
+            if state is None:
+                break
+            tasks.put((state, slot))
+
+        arrived = {}
+        try:
+            for state in states[1:]:
+                frame = cache.get(state)
+                if frame is not None:
+                    emit(state, frame)
+                    continue
+                while state not in arrived:
+                    try:
+                        done, slot, error = results.get(timeout=1)
+                    except queue.Empty:
+                        if any(proc.exitcode not in (None, 0) for proc in procs):
+                            raise RuntimeError("A render worker exited unexpectedly")
+                        continue
+                    if error is not None:
+                        raise RuntimeError(f"Rendering frame {done} failed:\n{error}")
+                    arrived[done] = slot
+                slot = arrived.pop(state)
+                emit(state, slots[slot])
+                state = next(pending, None)
+                if state is not None:
+                    tasks.put((state, slot))
+        finally:
+            for _ in procs:
+                tasks.put(None)
+            for proc in procs:
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()
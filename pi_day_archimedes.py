@@ -2,7 +2,9 @@ import math
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
-from PIL import Image
+import frame_pipeline
+import parallel_render
+import stream_encoder
 
 def archimedes_pi(sides):
     angle = 360.0 / sides
@@ -10,8 +12,7 @@ def archimedes_pi(sides):
     perimeter = sides * math.sin(half_angle_rad) * 2.0
     return perimeter / 2.0  
 
-def animate_archimedes(max_sides=96):
-    frames = []
+def archimedes_renderer():
     fig, ax = plt.subplots()
     ax.set_aspect('equal')
     ax.set_xlim(-1.2, 1.2)
@@ -63,15 +64,18 @@ def animate_archimedes(max_sides=96):
         
         ax.set_title(f"Sides: {sides}, Pi ≈ {pi_approx:.4f}")
         
-        fig.canvas.draw()
-        image = Image.frombytes('RGB', fig.canvas.get_width_height(), fig.canvas.tostring_rgb())
-        frames.append(image)
+    def draw(sides):
+        update(sides)
+        return frame_pipeline.figure_to_bgr(fig)
         
-    for i in range(3, max_sides + 1):
-        update(i)
-        
-    frames[0].save('archimedes_pi.gif', save_all=True, append_images=frames[1:], loop=0, duration=1000)
-    plt.close(fig)
+    draw.close = lambda: plt.close(fig)
+    return draw
+
+def animate_archimedes(max_sides=96, workers=1, filename='archimedes_pi.gif'):
+    gif = stream_encoder.GifEncoder(filename, duration=1000, loop=0)
+    parallel_render.render(archimedes_renderer, range(3, max_sides + 1), gif, workers=workers)
+    gif.release()
 
-animate_archimedes()
+if __name__ == "__main__":
+    animate_archimedes()
 
@@ -2,6 +2,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import random
+import frame_pipeline
+import parallel_render
+import stream_encoder
 
 def generate_coffee_data(num_points=50):
     weather = np.random.normal(0, 1, num_points)  # Standard normal distribution
@@ -10,8 +13,7 @@ def generate_coffee_data(num_points=50):
     price = 5 + 2 * weather - 1.5 * yield_ + 3 * demand + np.random.normal(0, 1, num_points)  # Price with noise
     return weather, yield_, demand, price
 
-def animate_regression():
-    weather, yield_, demand, price = generate_coffee_data()
+def regression_renderer(demand, price):
     fig, ax = plt.subplots()
     ax.set_xlabel("Demand")
     ax.set_ylabel("Coffee Bean Price (Fictitious)")
@@ -41,8 +43,21 @@ def animate_regression():
         
         return scatter, line,
     
-    ani = animation.FuncAnimation(fig, update, frames=len(demand), init_func=init, blit=True, repeat=False)
-    ani.save('coffee_regression.gif', writer='pillow', fps=10)
-    plt.close(fig)
+    renderer = frame_pipeline.IncrementalRenderer(fig, init())
+    
+    def draw(frame):
+        update(frame)
+        return renderer.render()
+    
+    draw.close = lambda: plt.close(fig)
+    return draw
+
+def animate_regression(workers=1, filename='coffee_regression.gif', num_points=50):
+    # Data is drawn once here so every render process plots the same points
+    weather, yield_, demand, price = generate_coffee_data(num_points)
+    gif = stream_encoder.GifEncoder(filename, fps=10)
+    parallel_render.render(regression_renderer, range(len(demand)), gif, workers=workers, args=(demand, price))
+    gif.release()
 
-animate_regression()
+if __name__ == "__main__":
+    animate_regression()
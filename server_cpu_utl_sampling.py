@@ -1,35 +1,74 @@
-import psutil
-import time
-import statistics
 import socket
+import argparse
 from datetime import datetime
+from host_metrics import Collector, WINDOWS
+from timeseries_log import TimeSeriesWriter
+from fleet_metrics import FleetAgent, parse_address
+from tick_scheduler import Ticker, overhead_line
 
-sampling_interval = 1  # Second
-samples_per_minute = 60 // sampling_interval
-minutes_per_batch = 1  # Average per x min
-samples_per_batch = samples_per_minute * minutes_per_batch
+sampling_interval = 1  # Seconds; --interval goes down to 0.01
+minutes_per_batch = 1  # Report every x min
 server_name = socket.gethostname()
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-filename = f"CPU_Usage_{server_name}_{timestamp}.txt"
-cpu_samples = []
-print(f"Monitoring CPU usage... Logging to {filename}. Press Ctrl+C to stop.")
-
-try:
-    with open(filename, "w") as file:
-        file.write("Server Name, Timestamp, Batch Average (%), Std Dev (%)\n") 
-        
-        while True:
-            cpu_usage = psutil.cpu_percent(interval=sampling_interval)
-            cpu_samples.append(cpu_usage)
-            if len(cpu_samples) >= samples_per_batch:
-                batch_mean = statistics.mean(cpu_samples)
-                batch_std_dev = statistics.stdev(cpu_samples) if len(cpu_samples) > 1 else 0.0
-                batch_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                file.write(f"{server_name}, {batch_timestamp}, {batch_mean:.2f}, {batch_std_dev:.2f}\n")
-                file.flush()  
-                print(f"[{batch_timestamp}] Batch Average: {batch_mean:.2f}%, Std Dev: {batch_std_dev:.2f}%")
-                cpu_samples = [] 
-                
-except KeyboardInterrupt:
-    print("\nMonitoring stopped.")
+log_dir = "cpu_logs"  # Binary segments, read back with timeseries_log.read_range
+segment_max_bytes = 64 * 1024 * 1024
+segment_max_seconds = 24 * 3600  # New segment at least once a day
 
+
+def report_line(collector, window):
+    stats = collector.stats(window)
+    cpu, mem = stats["cpu"], stats["mem_percent"]
+    hot = ", ".join(f"{core} {p95:.0f}%" for core, p95 in collector.hot_cores(window))
+    return (f"{window // 60:>3} min: CPU {cpu['mean']:5.1f}% ±{cpu['std']:4.1f} "
+            f"p50/p95/p99 {cpu['p50']:5.1f}/{cpu['p95']:5.1f}/{cpu['p99']:5.1f}  "
+            f"mem {mem['mean']:4.1f}%  disk r/w {stats['disk_read_Bps']['mean'] / 1e6:.1f}/"
+            f"{stats['disk_write_Bps']['mean'] / 1e6:.1f} MB/s  net tx/rx {stats['net_sent_Bps']['mean'] / 1e6:.1f}/"
+            f"{stats['net_recv_Bps']['mean'] / 1e6:.1f} MB/s  hot cores: {hot}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample CPU, memory, disk and network usage")
+    parser.add_argument("--collector", help="host:port of a fleet_metrics.py collector to stream samples to")
+    parser.add_argument("--udp", action="store_true", help="Send to the collector over UDP instead of TCP")
+    parser.add_argument("--interval", type=float, default=sampling_interval, help="Seconds between samples")
+    args = parser.parse_args()
+    interval = args.interval
+    samples_per_batch = max(1, round(60 * minutes_per_batch / interval))
+
+    collector = Collector(interval=interval, windows=WINDOWS)
+    agent = None
+    if args.collector:
+        # About 10 s of samples per message; FleetAgent lowers that to fit its message size limit
+        agent = FleetAgent(parse_address(args.collector), server_name, collector.names, interval=interval,
+                           batch=max(1, round(10 / interval)), transport="udp" if args.udp else "tcp")
+    print(f"Monitoring CPU usage... Logging to {log_dir}/. Press Ctrl+C to stop.")
+
+    try:
+        with TimeSeriesWriter(log_dir, server_name, collector.names, interval=interval,
+                              max_bytes=segment_max_bytes, max_seconds=segment_max_seconds,
+                              batch=samples_per_batch) as log:
+            # Deadline ticks: logging and printing below never push the next sample back
+            ticker = Ticker(interval)
+            samples = 0
+            while True:
+                t = ticker.wait()
+                row = collector.sample(t)
+                log.append(t, row)
+                if agent:
+                    agent.append(t, row)
+                samples += 1
+                if samples % samples_per_batch == 0:
+                    batch_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    print(f"[{batch_timestamp}]")
+                    for window in WINDOWS:
+                        print("  " + report_line(collector, window))
+                    print("  " + overhead_line(ticker.overhead()))
+
+    except KeyboardInterrupt:
+        print("\nMonitoring stopped.")
+    finally:
+        if agent:
+            agent.close()
+
+
+if __name__ == "__main__":
+    main()
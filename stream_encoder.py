@@ -0,0 +1,196 @@
+import io
+import struct
+import cv2
+import numpy as np
+from PIL import Image
+from frame_pipeline import timed
+
+# Fallback colours appended to every adaptive GIF palette, so hues that only appear
+# after the first frame still have a reasonable nearest match
+_CUBE_LEVELS = (0, 85, 170, 255)
+_CUBE = [(r, g, b) for r in _CUBE_LEVELS for g in _CUBE_LEVELS for b in _CUBE_LEVELS]
+
+
+def build_palette(frames, colors=256):
+    """
+    Builds a GIF palette (a mode "P" PIL image) from one or more sample BGR frames.
+    The result can be passed to GifEncoder(palette=...) and reused across videos.
+    """
+    frames = [frames] if isinstance(frames, np.ndarray) else list(frames)
+    sample = np.concatenate([f[..., ::-1] for f in frames], axis=0)
+    adaptive = Image.fromarray(np.ascontiguousarray(sample)).quantize(colors - len(_CUBE), method=Image.Quantize.MEDIANCUT)
+    used = adaptive.getpalette()[:3 * (colors - len(_CUBE))]
+    table = used + [c for rgb in _CUBE for c in rgb]
+    palette = Image.new("P", (1, 1))
+    palette.putpalette(table + [0] * (768 - len(table)))
+    return palette
+
+
+def _nearest_indices(rgb, table):
+    # Exact nearest-colour lookup; charts only hold a few thousand distinct colours
+    keys = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    uniq, inverse = np.unique(keys.ravel(), return_inverse=True)
+    colors = np.stack([uniq >> 16, (uniq >> 8) & 0xFF, uniq & 0xFF], axis=-1).astype(np.int32)
+    lookup = np.empty(len(uniq), dtype=np.uint8)
+    for start in range(0, len(uniq), 4096):
+        chunk = colors[start:start + 4096]
+        lookup[start:start + 4096] = ((chunk[:, None, :] - table[None, :, :]) ** 2).sum(axis=-1).argmin(axis=1)
+    return lookup[inverse].reshape(rgb.shape[:2])
+
+
+class _GifIndexer:
+    """Maps BGR frames to palette indices. Picklable, so render workers can run it instead of the writer."""
+
+    def __init__(self, palette, colors, dither):
+        self.palette = palette
+        self.colors = colors
+        self.dither = dither
+
+    def __call__(self, frame):
+        rgb = np.ascontiguousarray(frame[..., ::-1])
+        if self.dither:
+            return np.asarray(Image.fromarray(rgb).quantize(palette=self.palette, dither=Image.Dither.FLOYDSTEINBERG))
+        return _nearest_indices(rgb, self.colors)
+
+
+def _gif_blocks(data):
+    """Splits a single-frame GIF into (global colour table, image block)."""
+    packed = data[10]
+    pos = 13
+    table = b""
+    if packed & 0x80:
+        size = 3 << ((packed & 0x07) + 1)
+        table = data[pos:pos + size]
+        pos += size
+    while data[pos] != 0x3B:
+        start = pos
+        if data[pos] == 0x21:  # Extension: introducer and label, then sub-blocks
+            pos += 2
+        elif data[pos] == 0x2C:  # Image descriptor, optional local table, LZW code size, then sub-blocks
+            pos += 10
+            if data[start + 9] & 0x80:
+                pos += 3 << ((data[start + 9] & 0x07) + 1)
+            pos += 1
+        else:
+            raise ValueError(f"Unexpected GIF block 0x{data[pos]:02x}")
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+        if data[start] == 0x2C:
+            return table, data[start:pos]
+    raise ValueError("GIF frame has no image data")
+
+
+class GifEncoder:
+    """
+    Streams BGR frames into an animated GIF as they arrive.
+
+    Each frame is quantized and written straight to disk, so memory use does not
+    grow with the number of frames. The palette is global: built from the first
+    frame (plus a small fallback colour cube) unless one from build_palette() is
+    given, and stored once in the file header.
+
+    Mapping pixels to the palette is most of the cost. Once the palette is known,
+    worker_stage() hands out that step so parallel_render can run it in its
+    workers and pass indexed frames to write_prepared(), leaving only LZW packing
+    and the file write here.
+    """
+
+    def __init__(self, filename, fps=None, duration=None, loop=0, palette=None, dither=False):
+        self.filename = filename
+        self.duration = duration if duration is not None else int(1000 / fps)
+        self.loop = loop
+        self.palette = palette
+        self.dither = dither
+        self.file = None
+        self.frames = 0
+        self.indexer = None
+
+    def worker_stage(self):
+        """The frame -> palette indices step for write_prepared(), or None until the first frame fixed the palette."""
+        return self.indexer
+
+    def write(self, frame):
+        with timed("encode"):
+            if self.palette is None:
+                self.palette = build_palette(frame)
+            if self.indexer is None:
+                self._set_palette()
+            indexed = self.indexer(frame)
+        self.write_prepared(indexed)
+
+    def write_prepared(self, indexed):
+        """Writes a frame already mapped to palette indices by worker_stage()."""
+        with timed("encode"):
+            if self.file is None:
+                self._write_header((indexed.shape[1], indexed.shape[0]))
+            indexed = Image.fromarray(indexed, "P")
+            indexed.putpalette(self.table)
+
+            buf = io.BytesIO()
+            indexed.save(buf, "GIF", optimize=False)
+            table, image = _gif_blocks(buf.getvalue())
+            if table != self.table and not image[9] & 0x80:
+                # PIL rewrote the palette; ship it with the frame as a local colour table
+                packed = image[9] | 0x80 | ((len(table) // 3).bit_length() - 2)
+                image = image[:9] + bytes([packed]) + table + image[10:]
+
+        with timed("write"):
+            # Graphic control extension: no disposal, delay in 1/100 s
+            self.file.write(b"!\xf9\x04\x04" + struct.pack("<H", round(self.duration / 10)) + b"\x00\x00")
+            self.file.write(image)
+        self.frames += 1
+
+    def _set_palette(self):
+        self.table = bytes(self.palette.getpalette()[:768]).ljust(768, b"\x00")
+        self.colors = np.frombuffer(self.table, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        self.indexer = _GifIndexer(self.palette, self.colors, self.dither)
+
+    def _write_header(self, size):
+        self.file = open(self.filename, "wb")
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0xF7, 0, 0))
+        self.file.write(self.table)
+        if self.loop is not None:
+            self.file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\x00")
+
+    def release(self):
+        if self.file is not None:
+            with timed("write"):
+                self.file.write(b";")
+                self.file.close()
+            self.file = None
+
+
+class Mp4Encoder:
+    """Streams BGR frames into cv2.VideoWriter, opened on the first frame when no size is given."""
+
+    def __init__(self, filename, fps, size=None, codec="mp4v"):
+        self.filename = filename
+        self.fps = fps
+        self.size = tuple(size) if size is not None else None
+        self.codec = codec
+        self.video = None
+        self.frames = 0
+
+    def write(self, frame):
+        if self.size is None:
+            self.size = (frame.shape[1], frame.shape[0])
+        if self.video is None:
+            self.video = cv2.VideoWriter(self.filename, cv2.VideoWriter_fourcc(*self.codec), self.fps, self.size)
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        with timed("encode"):
+            self.video.write(frame)
+        self.frames += 1
+
+    def release(self):
+        if self.video is not None:
+            with timed("write"):
+                self.video.release()
+            self.video = None
+
+
+def open_encoder(filename, fps, **kwargs):
+    if filename.lower().endswith(".gif"):
+        return GifEncoder(filename, fps=fps, **kwargs)
+    return Mp4Encoder(filename, fps, **kwargs)
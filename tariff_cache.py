@@ -0,0 +1,114 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from collections import OrderedDict
+import numpy as np
+import tariff_engine
+
+CACHE_DIR = None  # Set to override; otherwise $TARIFF_CACHE_DIR or ~/.cache/tariff_cache (see cache_dir)
+MEMORY_ENTRIES = 512
+
+_memory = OrderedDict()
+_disk_failed = False  # Set after the first failed write; later calls stay in memory
+
+
+def cache_key(*args, **kwargs):
+    """
+    Content hash of a simulation request. Dicts are hashed in insertion order since
+    sector order is part of the result, and the engine's MODEL_VERSION is mixed in
+    so a model change never serves stale results.
+    """
+    def canonical(value):
+        if isinstance(value, dict):
+            return [[k, canonical(v)] for k, v in value.items()]
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return [canonical(v) for v in value]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    payload = json.dumps([tariff_engine.MODEL_VERSION, canonical(args), canonical(sorted(kwargs.items()))])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_dir():
+    """
+    Absolute on-disk cache directory, resolved when first needed rather than at
+    import, so plain calls never drop a cache into whatever directory they run from.
+    """
+    path = CACHE_DIR or os.environ.get("TARIFF_CACHE_DIR")
+    if not path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "tariff_cache")
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def _disk_path(key):
+    return os.path.join(cache_dir(), f"v{tariff_engine.MODEL_VERSION}", key[:2], f"{key}.npz")
+
+
+def _remember(key, entry):
+    _memory[key] = entry
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def simulate(tariff_rate, sector_percentages, elasticities, inflation_rate=0.02, retaliation_factor=0.05,
+             steps=4, steps_per_year=1, floor=None, gdp=None, exports=None, imports=None, disk=True):
+    """
+    Memoized tariff_engine.simulate: an in-memory LRU in front of an on-disk npz store.
+    Returns (countries, grid) like the engine; the grid is a fresh copy.
+    """
+    key = cache_key(tariff_rate, sector_percentages, elasticities, inflation_rate, retaliation_factor,
+                    steps, steps_per_year, floor, gdp, exports, imports)
+    entry = _memory.get(key)
+    if entry is not None:
+        _memory.move_to_end(key)
+        return entry[0], entry[1].copy()
+
+    disk = disk and not _disk_failed
+    path = _disk_path(key)
+    if disk and os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                entry = (data["countries"].tolist(), data["grid"])
+        except (OSError, ValueError, KeyError):
+            entry = None  # Corrupt or partial file, recompute below
+    if entry is None:
+        entry = tariff_engine.simulate(tariff_rate, sector_percentages, elasticities, inflation_rate,
+                                       retaliation_factor, steps, steps_per_year, floor, gdp, exports, imports)
+        if disk:
+            _write(path, entry)
+
+    entry[1].flags.writeable = False
+    _remember(key, entry)
+    return entry[0], entry[1].copy()
+
+
+def _write(path, entry):
+    # Write-then-rename so concurrent readers never see a half-written file.
+    # A cache directory that cannot be written (read-only or missing home) only costs the disk tier.
+    global _disk_failed
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, countries=np.array(entry[0]), grid=entry[1])
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write tariff cache entry {path}: {e}; caching in memory only from now on")
+        _disk_failed = True
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def clear(memory=True, disk=False):
+    """Drops the memory tier and, with disk=True, every on-disk entry including older model versions."""
+    if memory:
+        _memory.clear()
+    if disk and os.path.isdir(cache_dir()):
+        shutil.rmtree(cache_dir())
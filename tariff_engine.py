@@ -0,0 +1,85 @@
+import numpy as np
+
+# Bump whenever the model changes so cached results (tariff_cache) are not reused
+MODEL_VERSION = 1
+
+# Baseline economies in trillions USD
+GDP = {"USA": 27.0, "China": 17.7, "EU": 18.8, "Mexico": 1.7, "Canada": 2.2}
+EXPORTS = {"USA": 2.1, "China": 3.6, "EU": 2.7, "Mexico": 0.5, "Canada": 0.6}
+IMPORTS = {"USA": 3.3, "China": 2.7, "EU": 2.6, "Mexico": 0.6, "Canada": 0.5}
+
+# Default scenario used by the scripts' main() and the CLI
+SECTOR_PERCENTAGES = {"Technology": 0.30, "Automotive": 0.20, "Agriculture": 0.15, "Energy": 0.20, "Manufacturing": 0.15}
+ELASTICITIES = {"Technology": 1.2, "Automotive": 0.8, "Agriculture": 0.9, "Energy": 0.6, "Manufacturing": 1.0}
+
+
+def country_arrays(gdp=None, exports=None, imports=None):
+    """
+    Returns (countries, gdp, exports, imports) with the economies laid out as
+    aligned float arrays. Any of the dicts can be swapped for a larger table.
+    """
+    gdp = GDP if gdp is None else gdp
+    exports = EXPORTS if exports is None else exports
+    imports = IMPORTS if imports is None else imports
+    countries = list(gdp.keys())
+    return (countries,
+            np.array([gdp[c] for c in countries], dtype=float),
+            np.array([exports[c] for c in countries], dtype=float),
+            np.array([imports[c] for c in countries], dtype=float))
+
+
+def sector_arrays(sector_percentages, elasticities):
+    sectors = list(sector_percentages.keys())
+    percents = np.array([sector_percentages[s] for s in sectors], dtype=float)
+    elastic = np.array([elasticities[s] for s in sectors], dtype=float)
+    return sectors, percents, elastic
+
+
+def impact_grid(tariff_rate, percents, elasticities, gdp, exports, imports,
+                inflation_rate=0.02, retaliation_factor=0.05, steps=4, steps_per_year=1, floor=None):
+    """
+    Computes the GDP impact (% change) for every country and time step in one pass.
+
+    The sector term does not depend on time, so the (country x sector) tensor is
+    reduced first and then broadcast against the per-step inflation/retaliation
+    decay. Rates may be scalars or arrays of shape (n,) and elasticities may be
+    (sectors,) or (n, sectors); the result is (countries, steps) or
+    (n, countries, steps) respectively.
+    """
+    tariff_rate = np.asarray(tariff_rate, dtype=float)[..., None]
+    elasticities = np.asarray(elasticities, dtype=float)
+
+    export_share = percents * (1 - tariff_rate * elasticities)
+    import_share = percents * (1 + tariff_rate * elasticities)
+    sector_impact = (exports[:, None] * export_share[..., None, :]
+                     - imports[:, None] * import_share[..., None, :])
+    impact = sector_impact.sum(axis=-1)
+
+    # Adjust for inflation and retaliatory tariffs over time
+    elapsed = np.arange(steps) / steps_per_year
+    inflation_rate = np.asarray(inflation_rate, dtype=float)[..., None]
+    retaliation_factor = np.asarray(retaliation_factor, dtype=float)[..., None]
+    grid = impact[..., None] * ((1 - inflation_rate) ** elapsed)[..., None, :]
+    grid *= (1 - retaliation_factor * elapsed)[..., None, :]
+    grid = grid / gdp[:, None] * 100
+
+    if floor is not None:
+        np.maximum(grid, floor, out=grid)
+    return grid
+
+
+def grid_to_dict(countries, grid):
+    return {country: row.tolist() for country, row in zip(countries, grid)}
+
+
+def simulate(tariff_rate, sector_percentages, elasticities, inflation_rate=0.02, retaliation_factor=0.05,
+             steps=4, steps_per_year=1, floor=None, gdp=None, exports=None, imports=None):
+    """
+    Dict-in, ndarray-out wrapper around impact_grid.
+    Returns (countries, grid) where grid has shape (countries, steps).
+    """
+    countries, gdp, exports, imports = country_arrays(gdp, exports, imports)
+    _, percents, elastic = sector_arrays(sector_percentages, elasticities)
+    grid = impact_grid(tariff_rate, percents, elastic, gdp, exports, imports,
+                       inflation_rate, retaliation_factor, steps, steps_per_year, floor)
+    return countries, grid
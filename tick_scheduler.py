@@ -0,0 +1,114 @@
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+from host_metrics import Collector, WINDOWS
+from timeseries_log import TimeSeriesWriter
+
+"""
+# Sample at 100 ms for 60 s through the full sampler path and report its own cost
+# (exit code 1 if it uses more than 1% of a core)
+python3 tick_scheduler.py --interval 0.1 --seconds 60
+
+# Same at 10 ms, with a looser budget
+python3 tick_scheduler.py --interval 0.01 --seconds 30 --max-cpu 10
+"""
+
+JITTER_HISTORY = 4096  # Most recent tick latenesses kept for percentiles
+
+
+class Ticker:
+    """
+    Deadline ticks on time.monotonic(): tick k is due at start + k * interval no
+    matter how long the work between ticks took, so the schedule never drifts and
+    wall-clock jumps (NTP, DST) cannot stretch or bunch it. When work overruns a
+    whole interval the missed deadlines are skipped and counted instead of being
+    fired back to back.
+
+    Every tick's lateness (how long after its deadline it actually woke) and the
+    process CPU time used since the last overhead() call are recorded, so a sampler
+    can report what it costs.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.start = time.monotonic()
+        self.wall = time.time()  # Wall-clock time of tick 0; tick timestamps are derived from it
+        self.index = 0
+        self.skipped = 0
+        self.lateness = np.zeros(JITTER_HISTORY)
+        self.count = 0
+        self._mark = (time.monotonic(), time.process_time(), 0)
+
+    def wait(self):
+        """Sleeps until the next deadline and returns that tick's wall-clock timestamp."""
+        self.index += 1
+        deadline = self.start + self.index * self.interval
+        now = time.monotonic()
+        if now >= deadline + self.interval:
+            missed = int((now - deadline) // self.interval)
+            self.index += missed
+            self.skipped += missed
+            deadline += missed * self.interval
+        if deadline > now:
+            time.sleep(deadline - now)
+        self.lateness[self.count % JITTER_HISTORY] = time.monotonic() - deadline
+        self.count += 1
+        return self.wall + self.index * self.interval
+
+    def overhead(self):
+        """
+        {"cpu_percent", "ticks", "skipped", "jitter_p50_ms", "jitter_p99_ms", "jitter_max_ms"}
+        since the previous call: process CPU time as a percentage of one core, and
+        lateness of the recent ticks (up to JITTER_HISTORY of them).
+        """
+        wall, cpu, count = time.monotonic(), time.process_time(), self.count
+        last_wall, last_cpu, last_count = self._mark
+        self._mark = (wall, cpu, count)
+        recent = self.lateness[:min(count, JITTER_HISTORY)] if count - last_count >= JITTER_HISTORY else \
+            self.lateness[np.arange(last_count, count) % JITTER_HISTORY]
+        p50, p99, top = 0.0, 0.0, 0.0
+        if len(recent):
+            (p50, p99), top = np.percentile(recent, (50, 99)).tolist(), float(recent.max())
+        return {"cpu_percent": 100 * (cpu - last_cpu) / max(wall - last_wall, 1e-9), "ticks": count - last_count,
+                "skipped": self.skipped, "jitter_p50_ms": p50 * 1e3, "jitter_p99_ms": p99 * 1e3,
+                "jitter_max_ms": top * 1e3}
+
+
+def overhead_line(stats):
+    return (f"sampler: {stats['cpu_percent']:.2f}% of a core over {stats['ticks']} ticks, "
+            f"jitter p50/p99/max {stats['jitter_p50_ms']:.2f}/{stats['jitter_p99_ms']:.2f}/"
+            f"{stats['jitter_max_ms']:.2f} ms, {stats['skipped']} skipped")
+
+
+def benchmark(interval, seconds):
+    """Runs the sampler's per-tick work (collect, window stats, binary log) for a while; returns overhead()."""
+    collector = Collector(interval=interval, windows=WINDOWS)
+    with tempfile.TemporaryDirectory() as log_dir:
+        with TimeSeriesWriter(log_dir, "bench", collector.names, interval=interval,
+                              batch=max(1, round(60 / interval))) as log:
+            ticker = Ticker(interval)
+            ticker.overhead()  # Start the CPU accounting after setup
+            while ticker.index * interval < seconds:
+                t = ticker.wait()
+                log.append(t, collector.sample(t))
+            return ticker.overhead()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the sampler's own CPU cost and tick jitter")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between samples")
+    parser.add_argument("--seconds", type=float, default=60.0, help="How long to sample")
+    parser.add_argument("--max-cpu", type=float, default=1.0, help="Budget in percent of one core")
+    args = parser.parse_args()
+
+    stats = benchmark(args.interval, args.seconds)
+    print(f"interval {args.interval * 1000:.0f} ms, " + overhead_line(stats))
+    if stats["cpu_percent"] > args.max_cpu:
+        print(f"Over budget: {stats['cpu_percent']:.2f}% > {args.max_cpu}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import struct
+import argparse
+from datetime import datetime
+import numpy as np
+
+"""
+# Summarize the last day of samples in cpu_logs, host by host
+python3 timeseries_log.py cpu_logs --hours 24
+
+# One host, two columns, explicit range
+python3 timeseries_log.py cpu_logs --host web1 --columns cpu mem_percent --start 2026-10-01 --end 2026-11-01
+"""
+
+MAGIC = b"TSLOG\x00\x01\x00"
+SUFFIX = ".tsl"
+# magic, header length, column count, sampling interval, segment start time
+_HEADER = struct.Struct("<8sIIdd")
+
+
+def record_dtype(width):
+    # Fixed-width record: float64 unix time followed by one float32 per column
+    return np.dtype([("t", "<f8"), ("v", "<f4", (width,))])
+
+
+def _header_bytes(host, names, interval, start):
+    meta = json.dumps({"host": host, "names": list(names)}).encode()
+    length = _HEADER.size + 4 + len(meta)
+    length += -length % 8  # Records start 8-byte aligned
+    header = _HEADER.pack(MAGIC, length, len(names), interval, start) + struct.pack("<I", len(meta)) + meta
+    return header.ljust(length, b"\x00")
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        fixed = f.read(_HEADER.size + 4)
+        magic, length, width, interval, start = _HEADER.unpack(fixed[:_HEADER.size])
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a time-series segment")
+        meta_len = struct.unpack("<I", fixed[_HEADER.size:])[0]
+        meta = json.loads(f.read(meta_len))
+    return {"length": length, "width": width, "interval": interval, "start": start,
+            "host": meta["host"], "names": meta["names"]}
+
+
+class TimeSeriesWriter:
+    """
+    Appends fixed-width binary records to rotating segment files
+    <directory>/<host>_<YYYYmmdd_HHMMSS>.tsl. Rows are buffered and written batch
+    rows at a time in one write call. A new segment starts once the current one
+    reaches max_bytes or spans max_seconds, and whenever the wall clock steps
+    backwards (NTP), so the times within a segment never decrease. A crash loses at
+    most the unwritten batch; a torn last record is ignored by the reader.
+    """
+
+    def __init__(self, directory, host, names, interval=1.0, max_bytes=64 * 1024 * 1024,
+                 max_seconds=86400, batch=60):
+        self.directory = directory
+        self.host = host
+        self.names = list(names)
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.dtype = record_dtype(len(self.names))
+        self.buffer = np.zeros(batch, dtype=self.dtype)
+        self.pending = 0
+        self.file = None
+        self.last_time = -np.inf
+        os.makedirs(directory, exist_ok=True)
+
+    def _rotate(self, t):
+        if self.file:
+            self.file.close()
+        # After a clock step the name may already be taken; never append to another segment
+        base = os.path.join(self.directory, f"{self.host}_{datetime.fromtimestamp(t).strftime('%Y%m%d_%H%M%S')}")
+        self.path, n = base + SUFFIX, 1
+        while os.path.exists(self.path):
+            self.path, n = f"{base}_{n}{SUFFIX}", n + 1
+        self.file = open(self.path, 'wb')
+        self.file.write(_header_bytes(self.host, self.names, self.interval, t))
+        self.segment_start = t
+
+    def append(self, t, row):
+        self.buffer[self.pending] = (t, row)
+        self.pending += 1
+        if self.pending == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = self.buffer[:self.pending]
+        t = rows["t"]
+        bounds = [0, *(np.flatnonzero(t[1:] < t[:-1]) + 1).tolist(), len(rows)]  # Split at backward steps
+        for lo, hi in zip(bounds, bounds[1:]):
+            first = t[lo]
+            if (self.file is None or first < self.last_time or self.file.tell() >= self.max_bytes
+                    or first - self.segment_start >= self.max_seconds):
+                self._rotate(first)
+            self.file.write(rows[lo:hi].tobytes())
+            self.last_time = t[hi - 1]
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_segment(path):
+    """(header, records) with records a read-only memory map of the complete records in the segment."""
+    header = read_header(path)
+    dtype = record_dtype(header["width"])
+    count = (os.path.getsize(path) - header["length"]) // dtype.itemsize
+    if count <= 0:
+        return header, np.zeros(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode="r", offset=header["length"], shape=(count,))
+
+
+def list_segments(directory):
+    """{host: [(segment start, path), ...] in time order}, with the host taken from each segment's header."""
+    hosts = {}
+    for name in os.listdir(directory):
+        if name.endswith(SUFFIX):
+            path = os.path.join(directory, name)
+            header = read_header(path)
+            hosts.setdefault(header["host"], []).append((header["start"], path))
+    for segments in hosts.values():
+        segments.sort()
+    return hosts
+
+
+def read_range(directory, host, start=None, end=None, columns=None):
+    """
+    Samples of one host with start <= t < end, as (times, values, names). Segments
+    are memory-mapped and sliced with a binary search on their timestamps, so only
+    the requested range and columns are copied out; segments starting at or after
+    end are never mapped. A segment whose times are not sorted (a clock step logged
+    before the writer split on them) is filtered with a mask instead. names defaults
+    to the columns of the host's first segment; a column missing from a segment
+    (e.g. cores added since) reads as NaN there.
+    """
+    start = -np.inf if start is None else start
+    end = np.inf if end is None else end
+    times, values, names = [], [], columns
+    for segment_start, path in list_segments(directory).get(host, []):
+        if segment_start >= end:
+            break
+        header, records = open_segment(path)
+        if names is None:
+            names = header["names"]
+        if not len(records):
+            continue
+        t = records["t"]
+        if np.all(t[1:] >= t[:-1]):
+            rows = slice(np.searchsorted(t, start, "left"), np.searchsorted(t, end, "left"))
+        else:
+            rows = np.flatnonzero((t >= start) & (t < end))
+        selected = np.array(t[rows])
+        if len(selected):
+            times.append(selected)
+            block = np.full((len(selected), len(names)), np.nan, dtype=np.float32)
+            present = [(i, header["names"].index(c)) for i, c in enumerate(names) if c in header["names"]]
+            if present:
+                out, src = zip(*present)
+                block[:, list(out)] = records["v"][rows][:, list(src)]
+            values.append(block)
+    names = names or []
+    if not times:
+        return np.zeros(0), np.zeros((0, len(names)), dtype=np.float32), names
+    return np.concatenate(times), np.concatenate(values), names
+
+
+def _parse_time(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read samples from a binary time-series log directory")
+    parser.add_argument("directory")
+    parser.add_argument("--host", help="Only this host (default: every host in the directory, one by one)")
+    parser.add_argument("--columns", nargs="+", help="Columns to load (default: all)")
+    parser.add_argument("--start", type=_parse_time, help="ISO date/time")
+    parser.add_argument("--end", type=_parse_time, help="ISO date/time")
+    parser.add_argument("--hours", type=float, help="Shortcut for --start N hours ago")
+    args = parser.parse_args()
+    if args.hours:
+        args.start = time.time() - args.hours * 3600
+
+    for host in [args.host] if args.host else sorted(list_segments(args.directory)):
+        t0 = time.perf_counter()
+        times, values, names = read_range(args.directory, host, args.start, args.end, args.columns)
+        elapsed = time.perf_counter() - t0
+        print(f"{host}: {len(times)} samples loaded in {elapsed * 1000:.1f} ms")
+        if len(times):
+            print(f"  {datetime.fromtimestamp(times[0])} .. {datetime.fromtimestamp(times[-1])}")
+            for i, name in enumerate(names):
+                column = values[:, i]
+                print(f"  {name:<18} mean {np.nanmean(column):14.2f}  min {np.nanmin(column):14.2f}  "
+                      f"max {np.nanmax(column):14.2f}")
+
+
+if __name__ == "__main__":
+    main()
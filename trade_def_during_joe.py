@@ -22,37 +22,47 @@ node_x = [0, 0, 0, 0, 0.5, 1, 1, 1, 1]
 node_y = [0.1, 0.3, 0.5, 0.7, 0.5, 0.1, 0.3, 0.5, 0.7]
 
 
-fig = go.Figure(data=[go.Sankey(
-    node=dict(
-      pad=25,
-      thickness=10,
-      line=dict(color="black", width=0.5),
-      label=labels,
-      x=node_x,
-      y=node_y
-    ),
-    link=dict(
-      arrowlen=15,
-      source=source_indices,
-      target=target_indices,
-      value=values,
-      color=link_colors
-  ))])
-
-
-fig.add_annotation(
-    x=0.5,  
-    y=0.06, 
-    text="250(B)+ Total Deficit",
-    showarrow=False,  
-    font=dict(size=14, color="red"),
-    bgcolor="rgba(255,255,255,0.8)",  
-    xanchor="center"
-)
-
-
-fig.update_layout(
-    title_text="USA-Canada  Balance of Trade (Prev Gov's Tenure)",
-    font_size=10,
-)
-fig.show()
+def build_figure():
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+          pad=25,
+          thickness=10,
+          line=dict(color="black", width=0.5),
+          label=labels,
+          x=node_x,
+          y=node_y
+        ),
+        link=dict(
+          arrowlen=15,
+          source=source_indices,
+          target=target_indices,
+          value=values,
+          color=link_colors
+      ))])
+
+    fig.add_annotation(
+        x=0.5,  
+        y=0.06, 
+        text="250(B)+ Total Deficit",
+        showarrow=False,  
+        font=dict(size=14, color="red"),
+        bgcolor="rgba(255,255,255,0.8)",  
+        xanchor="center"
+    )
+
+    fig.update_layout(
+        title_text="USA-Canada  Balance of Trade (Prev Gov's Tenure)",
+        font_size=10,
+    )
+    return fig
+
+def main(out=None, show=True):
+    fig = build_figure()
+    if out:
+        fig.write_html(out)
+        print(f"Sankey saved as {out}")
+    if show:
+        fig.show()
+
+if __name__ == "__main__":
+    main()